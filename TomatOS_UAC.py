@@ -2,6 +2,39 @@ import os
 import secrets
 import json
 import hashlib
+import hmac
+
+# scrypt 参数 (n=2^14, r=8 约需 16MB 内存)
+scrypt_n = 2 ** 14
+scrypt_r = 8
+scrypt_p = 1
+
+def hash_password(password, salt=None):
+    """用 scrypt 哈希密码，返回 scrypt$n$r$p$盐$哈希 格式的字符串"""
+    if salt is None:
+        salt = secrets.token_hex(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt.encode(), n=scrypt_n, r=scrypt_r, p=scrypt_p, dklen=32)
+    return f"scrypt${scrypt_n}${scrypt_r}${scrypt_p}${salt}${digest.hex()}"
+
+def check_password(password, stored_hash, legacy_salt=None):
+    """校验密码，兼容旧版 SHA256(password + salt) 格式的哈希"""
+    if not stored_hash:
+        return False
+    if stored_hash.startswith("scrypt$"):
+        try:
+            _, n, r, p, salt, expected = stored_hash.split("$")
+            digest = hashlib.scrypt(password.encode(), salt=salt.encode(), n=int(n), r=int(r), p=int(p), dklen=len(expected) // 2)
+        except (ValueError, MemoryError):
+            return False
+        input_hash = digest.hex()
+    else:
+        # 旧版格式: SHA256(password + salt)
+        if legacy_salt is None:
+            return False
+        input_hash = hashlib.sha256((password + legacy_salt).encode()).hexdigest()
+        expected = stored_hash
+    # 常量时间比较，避免通过响应时间推测哈希
+    return hmac.compare_digest(input_hash, expected)
 
 class UAC:
     def __init__(self):
@@ -29,10 +62,7 @@ class UAC:
         stored_hash = self.config.get("admin_passhash")
         salt = self.config.get("salt")
         
-        # 计算输入密码的哈希
-        input_hash = hashlib.sha256((input_password + salt).encode()).hexdigest()
-        
-        if input_hash == stored_hash:
+        if check_password(input_password, stored_hash, salt):
             return True, "admin" # 这里的 admin 只是代表密码匹配成功，具体权限还需要结合 TOTP 判断
         
         return False, None
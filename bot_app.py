@@ -354,7 +354,7 @@ async def start_bot_terminal():
     print("=== TomatOS 机器人终端 ===")
     print("输入命令或消息，输入 'exit' 退出")
     
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
     while True:
         cmd = await loop.run_in_executor(None, input, ">> ")
         if cmd.lower() in ["exit", "quit"]:
@@ -30,7 +30,7 @@ class CommandHandler:
         cmd = cmd_parts[0]
 
         if cmd == "clear":
-            await ws.send_str(json.dumps({"type": "clear"}))
+            self.server.send_payload(ws, json.dumps({"type": "clear"}).encode())
         elif cmd == "uname":
             uname = platform.uname()
             if len(cmd_parts) > 1 and cmd_parts[1] == "-a":
@@ -42,8 +42,10 @@ class CommandHandler:
                 output = uname.system
             await self.server.send_output(ws, output + "\n")
         elif cmd == "whoami":
-            username = self.server.clients[ws].get("username", "user")
-            await self.server.send_output(ws, f"{username}\n")
+            client_state = self.server.clients.get(ws)
+            # 连接已注销时不再回复
+            if client_state is not None:
+                await self.server.send_output(ws, f"{client_state.username}\n")
         elif cmd == "date":
             await self.server.send_output(ws, f"{datetime.now().strftime('%a %b %d %H:%M:%S %Z %Y')}\n")
         elif cmd == "help":
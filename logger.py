@@ -10,11 +10,13 @@ import functools
 import asyncio
 
 enable_file_logging = False  # 全局开关，控制是否启用文件日志记录
+enable_debug_logging = True  # 全局开关，控制是否输出 debug 日志 (关闭后 debug 调用直接返回)
 
 class Logger:
     def __init__(self, log_file='log.txt'):
         self.enable_file_logging = enable_file_logging
         self.log_file = log_file if self.enable_file_logging else None
+        self.enable_debug_logging = enable_debug_logging
 
         self.timestamp_format = "%Y-%m-%d %H:%M:%S"
         self.timestamp_color = "#96E6E3"
@@ -68,6 +70,9 @@ class Logger:
                 f.write(f"{timestamp} {module_name}:{line_number} {level} {message}\n")
 
     def debug(self, message):
+        # 关闭时不取调用栈，热路径上的 debug 调用几乎没有开销
+        if not self.enable_debug_logging:
+            return
         module_name, line_number = self._get_caller_info()
         self._log("debug", message, self.debug_color, module_name, line_number)
     def info(self, message):
@@ -2,7 +2,7 @@ import asyncio
 import re
 from logger import logger
 from typing import Dict, Any, Optional
-from functools import wraps
+from functools import wraps, lru_cache
 import inspect
 import importlib
 import os
@@ -15,8 +15,23 @@ if message_adapters_path not in sys.path:
     sys.path.insert(0, message_adapters_path)
 
 cmd_prefix = ["/", "！", "!", "y"]
+# 构建前缀正则，例如 (?:/|!|y)，对前缀进行转义以防包含特殊字符
+prefix_regex = f"(?:{'|'.join(re.escape(p) for p in cmd_prefix)})"
+prefix_pattern = re.compile(f"^{prefix_regex}")
 ada_path = os.path.join(os.path.dirname(__file__), "message_adapters") # 信息适配器路径(TomatOS\message_adapters)
 
+@lru_cache(maxsize=1024)
+def compile_alias_pattern(alias_str: str) -> Optional[re.Pattern]:
+    """编译 前缀+别名+(空白字符 或 字符串结束) 的完整匹配正则，无效别名返回 None
+
+    这样可以匹配 "/help" 或 "/help me"，但不会匹配 "/helper"。
+    结果按别名缓存，每条消息不再重新拼接、查找正则。
+    """
+    try:
+        return re.compile(f"^{prefix_regex}{alias_str}(?:\\s|$)")
+    except re.error:
+        return None
+
 class TomatOS_Msghandler:
     def __init__(self):
         self.commands = []
@@ -113,40 +128,29 @@ class TomatOS_Msghandler:
     
     async def find_and_execute(self, message: str) -> Optional[Any]:
         # 查找命令(前缀+命令名/别名)
-        # 构建前缀正则，例如 (?:/|!|y)
-        # 对前缀进行转义以防包含特殊字符
-        escaped_prefixes = [re.escape(p) for p in cmd_prefix]
-        prefix_regex = f"(?:{'|'.join(escaped_prefixes)})"
-        
-        if re.match(f"^{prefix_regex}", message):
-            for command in self.commands:
-                # 检查别名列表
-                # 同时也检查主命令名，将其视为别名之一处理
-                potential_matches = [command["name"]] + command["alias"]
-                
-                for alias in potential_matches:
-                    # 获取别名字符串
-                    if hasattr(alias, "pattern"):
-                        alias_str = alias.pattern
-                    else:
-                        alias_str = str(alias)
-                    
-                    # 构建完整匹配正则：^前缀+别名+(空格或结束)
-                    # 注意：这里假设 alias_str 是普通字符串，如果包含正则特殊字符需要注意
-                    # 但根据 cli.py 的用法，它们似乎是普通字符串。
-                    # 为了支持正则别名，我们不转义 alias_str，但这样要求 alias_str 必须是合法的正则片段
-                    
-                    try:
-                        # 匹配：前缀 + 别名 + (空白字符 或 字符串结束)
-                        # 这样可以匹配 "/help" 或 "/help me"，但不会匹配 "/helper"
-                        full_pattern = f"^{prefix_regex}{alias_str}(?:\\s|$)"
-                        if re.match(full_pattern, message):
-                            logger.info(f"[TomatOS_command]执行命令 {command['name']} 匹配别名 {alias_str}")
-                            return await command["function"](message)
-                    except re.error:
-                        logger.warning(f"无效的正则别名: {alias_str}")
-                        continue
-                        
+        # 普通聊天消息没有命令前缀，直接返回，不遍历命令表
+        if not prefix_pattern.match(message):
+            return None
+
+        for command in self.commands:
+            # 检查别名列表
+            # 同时也检查主命令名，将其视为别名之一处理
+            for alias in (command["name"], *command["alias"]):
+                # 获取别名字符串
+                if hasattr(alias, "pattern"):
+                    alias_str = alias.pattern
+                else:
+                    alias_str = str(alias)
+
+                # 为了支持正则别名，我们不转义 alias_str，但这样要求 alias_str 必须是合法的正则片段
+                pattern = compile_alias_pattern(alias_str)
+                if pattern is None:
+                    logger.warning(f"无效的正则别名: {alias_str}")
+                    continue
+                if pattern.match(message):
+                    logger.info(f"[TomatOS_command]执行命令 {command['name']} 匹配别名 {alias_str}")
+                    return await command["function"](message)
+
         return None
     
     async def handle_message(self, message: Messagebase) -> Optional[Any]:
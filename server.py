@@ -4,15 +4,22 @@
 import asyncio
 import json
 import os
-from datetime import datetime
 from aiohttp import web
 import aiohttp
 import platform
+import socket
 import sys
 import psutil
 import re
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from logger import logger
 import random
+import time
+import functools
+import collections
+import threading
+import signal
 import pyotp
 import hashlib
 from TomatOS_UAC import UAC
@@ -22,6 +29,40 @@ from bot_app import TomatOS_bot
 from bot.api import bot_name
 from message_adapters.message_core import Messagebase
 
+# uvloop 可选 (不支持 Windows), 未安装时回退到默认事件循环
+# 主站点、适配器站点和控制台循环都跑在 main() 创建的同一个事件循环上
+uvloop = None
+if sys.platform != 'win32':
+    try:
+        import uvloop
+    except ImportError:
+        pass
+
+# orjson 可选, 未安装时回退到标准库 json (orjson 的 JSONDecodeError 是 json.JSONDecodeError 的子类)
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+
+    def json_dumps(obj):
+        return orjson.dumps(obj)
+except ImportError:
+    json_loads = json.loads
+
+    def json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+# 监听 socket 的 accept 队列长度 (aiohttp 默认 128)，实际上限还受内核 net.core.somaxconn 限制
+listen_backlog = 2048
+
+# 每个连接发送队列的上限 (帧数)，客户端收得太慢时超过上限就断开，避免内存无限增长
+send_queue_limit = 1024
+
+# 发往 WebTerminal 的消息帧都是 UTF-8 编码好的 JSON bytes (json_dumps)，
+# aiohttp 3.11+ 的 send_frame 可以把 bytes 直接作为文本帧发出，省去 decode 再 encode 一次
+ws_send_frame_supported = hasattr(web.WebSocketResponse, "send_frame")
+
 @dataclass
 class TomatOS_conn:
     service: str # 服务名称
@@ -31,14 +72,194 @@ class TomatOS_conn:
     http: web.Request # HTTP请求对象
     conn_host: str # 连接主机地址
     conn_port: int # 连接端口
+class ClientState:
+    """WebTerminal 客户端的会话状态"""
+    __slots__ = ("state", "host", "os", "language", "device_name", "username", "username_color", "user_id", "auth_level",
+                 "send_queue", "send_waker", "writer_task")
+
+    def __init__(self, host):
+        self.state = "init" # 会话状态 (init/login_user/login_pass/shell)
+        self.host = host # 客户端访问的主机名
+        self.os = "Linux" # 客户端操作系统
+        self.language = "zh-CN" # 客户端语言
+        self.device_name = "localhost" # 客户端设备名称
+        self.username = "user" # 登录用户名
+        self.username_color = None # 访客用户名颜色
+        self.user_id = "unknown" # 用户ID
+        self.auth_level = "guest" # 权限等级 (admin/guest)
+        self.send_queue = collections.deque() # 待发送的已编码消息帧
+        self.send_waker = None # 唤醒写任务的 Future
+        self.writer_task = None # 负责写 socket 的后台任务
+
 # 初始化 UAC
 uac = UAC()
 
+# web 目录的绝对路径 (导入时解析一次)
+web_dir = Path(__file__).resolve().parent / 'web'
+index_path = web_dir / 'index.html'
+
 
 server_prompt = ["TomatOS-Server/1.0", "TomatOS/1.0", "TomatOS[I'm Watching You]/1.0", "TomatOS-Hello/1.0", "TomatOS/114514.1919810", "YummyShaoBing-TomatOS/1.0", "aminuos-TomatOS/1.0", f"TomatOS-Bot/{bot_name}/1.0"] # 神秘服务器名字
 
+# 所有可能的 Server 头在导入时拼好
+server_headers = tuple(f"{prompt} Python/{platform.python_version()} aiohttp/{aiohttp.__version__}" for prompt in server_prompt)
+
 def get_server_header():
-    return f"{random.choice(server_prompt)} Python/{platform.python_version()} aiohttp/{aiohttp.__version__}"
+    return server_headers[random.randrange(len(server_headers))]
+
+# 客户端 UA 解析用的正则 (模块加载时编译一次)
+ua_os_regex = re.compile(r"Win|Mac|Harmony|Android|Linux")
+ua_os_priority = (("Win", "Windows"), ("Mac", "macOS"), ("Harmony", "HarmonyOS"), ("Android", "Android"), ("Linux", "Linux"))
+ua_harmony_regex = re.compile(r"(?:HarmonyOS|Android[^;]+);\s*([^;)]+)")
+ua_android_regex = re.compile(r"Android[^;]+;\s*([^;)]+)")
+whitespace_regex = re.compile(r"\s+")
+
+# 连接时模拟的 PowerShell 开头
+powershell_banners = {
+    "zh": (
+        "Windows PowerShell",
+        " ",
+        "版权所有 (C) Microsoft Corporation。保留所有权利。",
+        " ",
+        "安装最新的 PowerShell，以获得新功能和改进！https://aka.ms/PSWindows",
+        " ",
+    ),
+    "en": (
+        "Windows PowerShell",
+        " ",
+        "Copyright (C) Microsoft Corporation. All rights reserved.",
+        " ",
+        "Install the latest PowerShell for new features and improvements! https://aka.ms/PSWindows",
+        " ",
+    ),
+}
+
+# 连接时模拟的 ssh 命令行: 系统 -> (本地提示符, ssh 命令)
+ssh_banner_formats = {
+    "Windows": ("PS C:\\Windows\\System32>", "ssh TomatOS@{host}"),
+    "macOS": ("user@{device_name} ~ %", "ssh tomatos@{host}"),
+    "Linux": ("user@linux:~$", "ssh TomatOS@{host}"),
+    "Android": ("user@{device_name}:/ $", "ssh -p 8022 tomatos@{host}"),
+    "HarmonyOS": ("user@{device_name}:/ $", "ssh -p 8022 tomatos@{host}"),
+}
+
+# 未登录时模拟的本地提示符: 系统 -> f(username, device_name)
+local_prompt_formats = {
+    "Windows": lambda username, device_name: "PS C:\\Windows\\System32> ",
+    "macOS": lambda username, device_name: f"{username}@{device_name} ~ % ",
+    "Android": lambda username, device_name: f"{username}@{device_name}:/ $ ",
+    "HarmonyOS": lambda username, device_name: f"{username}@{device_name}:/ $ ",
+    "Linux": lambda username, device_name: f"{username}@TomatOS:~$ ",
+}
+
+# 系统信息缓存: 开机时间不会变, 负载和在线用户数 5 秒内复用, 避免每次登录都走系统调用
+system_info_ttl = 5
+system_info_cache = {"boot": None, "load_ts": float("-inf"), "load": (0.0, 0.0, 0.0), "users_ts": float("-inf"), "users": 0}
+
+def get_cached_system_info():
+    """返回 (开机时间戳, 系统负载, 在线用户数)"""
+    cache = system_info_cache
+    now = time.monotonic()
+    if cache["boot"] is None:
+        cache["boot"] = psutil.boot_time()
+    if now - cache["load_ts"] > system_info_ttl:
+        try:
+            cache["load"] = psutil.getloadavg()
+        except (AttributeError, OSError):
+            cache["load"] = (0.0, 0.0, 0.0)
+        cache["load_ts"] = now
+    if now - cache["users_ts"] > system_info_ttl:
+        cache["users"] = len(psutil.users())
+        cache["users_ts"] = now
+    return cache["boot"], cache["load"], cache["users"]
+
+# uptime 命令输出模板
+uptime_template = "{now} up {up},  {users} user{s},  load average: {l0:.2f}, {l1:.2f}, {l2:.2f}"
+
+def format_uptime():
+    """生成 uptime 命令的输出行"""
+    boot_time, load, users = get_cached_system_info()
+    days, rem = divmod(int(time.time() - boot_time), 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes = rem // 60
+    up = f"{days} days, {hours}:{minutes:02}" if days else f"{hours}:{minutes:02}"
+    return uptime_template.format(
+        now=time.strftime("%H:%M:%S"), up=up, users=users, s="s" if users != 1 else "",
+        l0=load[0], l1=load[1], l2=load[2])
+
+def output_payload(content, class_name="line"):
+    """编码一条 output 消息帧"""
+    return json_dumps({
+        "type": "output",
+        "content": content,
+        "className": class_name
+    })
+
+welcome_ascii = """
+  _______                     _    ____   _____ 
+ |__   __|                   | |  / __ \\ / ____|
+    | | ___  _ __ ___   __ _ | |_| |  | | (___  
+    | |/ _ \\| '_ ` _ \\ / _` || __| |  | |\\___ \\ 
+    | | (_) | | | | | | (_| || |_| |__| |____) |
+    |_|\\___/|_| |_| |_|\\__,_||\\__|\\____/|_____/ 
+"""
+
+# 固定的横幅在导入时编码一次，每次连接直接发送
+welcome_payloads = (
+    output_payload('<div class="welcome-line">欢迎来到 TomatOS 喵~</div>'),
+    output_payload(welcome_ascii, "ascii-art"),
+)
+powershell_banner_payloads = {
+    language: tuple(output_payload(line) for line in banner)
+    for language, banner in powershell_banners.items()
+}
+
+def make_reply_message(adapter_name, text):
+    """构造机器人回复的 Messagebase，除文本外其他字段都是固定值"""
+    now = int(time.time())
+    return Messagebase(
+        adapter=adapter_name,
+        text=str(text),
+        image=[],
+        file=[],
+        video=[],
+        audio=[],
+        at=[],
+        reply_to=None,
+        timestamp=now,
+        messageid=str(now),
+        userid=10000,
+        username=f"{bot_name}@TomatOS",
+        usercard="",
+        userrole="assistant",
+        conversation_id="web_terminal",
+        is_group=False,
+        event_type="message",
+        raw_data={}
+    )
+
+def make_text_message(adapter_name, text):
+    """把适配器收到的纯文本 (非 JSON) 消息直接构造成 Messagebase，字段与 WebClient 默认值一致"""
+    return Messagebase(
+        adapter=adapter_name,
+        text=text,
+        image=[],
+        file=[],
+        video=[],
+        audio=[],
+        at=[],
+        reply_to=None,
+        timestamp=int(time.time()),
+        messageid=None,
+        userid=10001,
+        username="WebClient_user",
+        usercard="",
+        userrole="member",
+        conversation_id="web_terminal",
+        is_group=False,
+        event_type="message",
+        raw_data={}
+    )
 
 class TomatOSServer:
     def __init__(self):
@@ -46,6 +267,13 @@ class TomatOSServer:
         self.bot_app = TomatOS_bot()
         self.command_handler = CommandHandler(self)
         self.adapter_sites = []  # 存储所有适配器站点的引用
+        self.closing_tasks = {}  # 正在关闭的连接 -> 关闭任务 (保留引用，避免任务被回收)
+        # 管理员用户名和 TOTP 在启动时解析一次，不用每次登录都重新解码密钥
+        self.admin_username = uac.get_admin_username()
+        totp_secret = uac.get_totp_secret()
+        self.totp = pyotp.TOTP(totp_secret) if totp_secret else None
+        # 生成用户颜色 / user_id 用的盐
+        self.color_salt = uac.config.get("salt", "default_salt") if uac.config else "default_salt"
 
     async def start_bot(self):
         if self.bot_app:
@@ -57,6 +285,7 @@ class TomatOSServer:
             
         # 使用集合跟踪已启动的适配器，避免重复启动
         started_adapters = set()
+        pending = []
         for adapter in self.bot_app.msg_handler.ada:
             # 跳过 WebTerminal，因为它已经由 server.py 的主逻辑处理了
             # if adapter.adapter == "TomatOS_WebTerminal": # 注释掉这段以允许多实例
@@ -71,179 +300,66 @@ class TomatOSServer:
             logger.info(f"正在启动适配器: {adapter.adapter}")
             if getattr(adapter, "conn_type", "") == "server":
                 if getattr(adapter, "conn_mode", "") == "websocket":
-                    await self.start_websocket_server(adapter)
+                    pending.append(self.start_websocket_server(adapter))
                     started_adapters.add(adapter_key)
 
+        # 各适配器互不依赖，并发启动
+        if pending:
+            await asyncio.gather(*pending)
+
     async def start_websocket_server(self, adapter):
         host = getattr(adapter, "conn_host", "0.0.0.0")
         port = getattr(adapter, "conn_port", 8080)
         
         app = web.Application()
+
+        # 适配器能力在启动时查一次，收到消息时直接查表，不再逐帧 hasattr
+        adapter_name = adapter.adapter
+        post_handlers = {
+            "message": getattr(adapter, "handle_message", None),
+            "notice": getattr(adapter, "handle_notice", None),
+        }
+        send_message = getattr(adapter, "send_message", None)
+        TEXT = aiohttp.WSMsgType.TEXT
+        ERROR = aiohttp.WSMsgType.ERROR
         
         async def ws_handler(request):
             ws = web.WebSocketResponse()
             await ws.prepare(request)
             
-            logger.info(f"适配器 {adapter.adapter} 收到连接: {request.remote}")
+            logger.info(f"适配器 {adapter_name} 收到连接: {request.remote}")
             
             try:
                 async for msg in ws:
-                    if msg.type == aiohttp.WSMsgType.TEXT:
+                    msg_type = msg.type
+                    if msg_type is TEXT:
+                        msg_base = None
                         try:
-                            data = json.loads(msg.data)
-                            post_type = data.get("post_type")
-                            
-                            msg_base = None
-                            if post_type == "message":
-                                if hasattr(adapter, "handle_message"):
-                                    msg_base = await adapter.handle_message(data)
-                            elif post_type == "notice":
-                                if hasattr(adapter, "handle_notice"):
-                                    msg_base = await adapter.handle_notice(data)
-                            
-                            if msg_base:
-                                # 1. 尝试作为命令执行 (仅针对文本消息)
-                                if msg_base.text:
-                                    cmd_response = await self.bot_app.msg_handler.find_and_execute(msg_base.text)
-                                    if cmd_response:
-                                        # 发送命令回复
-                                        logger.info(f"命令执行结果: {cmd_response}")
-                                        # 通过适配器发送回复
-                                        if hasattr(adapter, "send_message"):
-                                            reply_msg = Messagebase(
-                                                adapter=adapter.adapter,
-                                                text=str(cmd_response),
-                                                image=[],
-                                                file=[],
-                                                video=[],
-                                                audio=[],
-                                                at=[],
-                                                reply_to=None,
-                                                timestamp=int(datetime.now().timestamp()),
-                                                messageid=str(int(datetime.now().timestamp())),
-                                                userid=10000,
-                                                username=f"{bot_name}@TomatOS",
-                                                usercard="",
-                                                userrole="assistant",
-                                                conversation_id="web_terminal",
-                                                is_group=False,
-                                                event_type="message",
-                                                raw_data={}
-                                            )
-                                            await adapter.send_message(reply_msg, ws)
-                                        continue
-
-                                # 2. 转发给 bot_app 处理 (AI 聊天)
-                                reply = await self.bot_app.handle_chat_message(msg_base)
-                                if reply:
-                                    logger.info(f"Bot 回复: {reply}")
-                                    # 通过适配器发送回复
-                                    if hasattr(adapter, "send_message"):
-                                        reply_msg = Messagebase(
-                                            adapter=adapter.adapter,
-                                            text=str(reply),
-                                            image=[],
-                                            file=[],
-                                            video=[],
-                                            audio=[],
-                                            at=[],
-                                            reply_to=None,
-                                            timestamp=int(datetime.now().timestamp()),
-                                            messageid=str(int(datetime.now().timestamp())),
-                                            userid=10000,
-                                            username=f"{bot_name}@TomatOS",
-                                            usercard="",
-                                            userrole="assistant",
-                                            conversation_id="web_terminal",
-                                            is_group=False,
-                                            event_type="message",
-                                            raw_data={}
-                                        )
-                                        await adapter.send_message(reply_msg, ws)
+                            data = json_loads(msg.data)
                         except json.JSONDecodeError:
-                            # 如果不是JSON，尝试作为纯文本消息处理
-                            text_content = msg.data
-                            if text_content:
-                                # 创建简单的消息对象
-                                simple_data = {
-                                    "post_type": "message",
-                                    "text": text_content,
-                                    "timestamp": datetime.now().isoformat(),
-                                    "userid": 10001,
-                                    "username": "WebClient_user",
-                                    "conversation_id": "web_terminal",
-                                    "is_group": False
-                                }
-                                if hasattr(adapter, "handle_message"):
-                                    msg_base = await adapter.handle_message(simple_data)
-                                    if msg_base and msg_base.text:
-                                        # 尝试作为命令执行
-                                        cmd_response = await self.bot_app.msg_handler.find_and_execute(msg_base.text)
-                                        if cmd_response:
-                                            logger.info(f"命令执行结果: {cmd_response}")
-                                            # 发送命令回复
-                                            if hasattr(adapter, "send_message"):
-                                                reply_msg = Messagebase(
-                                                    adapter=adapter.adapter,
-                                                    text=str(cmd_response),
-                                                    image=[],
-                                                    file=[],
-                                                    video=[],
-                                                    audio=[],
-                                                    at=[],
-                                                    reply_to=None,
-                                                    timestamp=int(datetime.now().timestamp()),
-                                                    messageid=str(int(datetime.now().timestamp())),
-                                                    userid=10000,
-                                                    username=f"{bot_name}@TomatOS",
-                                                    usercard="",
-                                                    userrole="assistant",
-                                                    conversation_id="web_terminal",
-                                                    is_group=False,
-                                                    event_type="message",
-                                                    raw_data={}
-                                                )
-                                                await adapter.send_message(reply_msg, ws)
-                                        else:
-                                            # 转发给 bot_app 处理
-                                            reply = await self.bot_app.handle_chat_message(msg_base)
-                                            if reply:
-                                                logger.info(f"Bot 回复: {reply}")
-                                                # 发送AI回复
-                                                if hasattr(adapter, "send_message"):
-                                                    reply_msg = Messagebase(
-                                                        adapter=adapter.adapter,
-                                                        text=str(reply),
-                                                        image=[],
-                                                        file=[],
-                                                        video=[],
-                                                        audio=[],
-                                                        at=[],
-                                                        reply_to=None,
-                                                        timestamp=int(datetime.now().timestamp()),
-                                                        messageid=str(int(datetime.now().timestamp())),
-                                                        userid=10000,
-                                                        username=f"{bot_name}@TomatOS",
-                                                        usercard="",
-                                                        userrole="assistant",
-                                                        conversation_id="web_terminal",
-                                                        is_group=False,
-                                                        event_type="message",
-                                                        raw_data={}
-                                                    )
-                                                    await adapter.send_message(reply_msg, ws)
-                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                            # 如果不是JSON，作为纯文本消息处理，直接构造消息对象，不经过适配器再转换一次
+                            if msg.data:
+                                msg_base = make_text_message(adapter_name, msg.data)
+                        else:
+                            handler = post_handlers.get(data.get("post_type"))
+                            if handler is not None:
+                                msg_base = await handler(data)
+
+                        if msg_base:
+                            await self.dispatch_adapter_message(adapter_name, send_message, ws, msg_base)
+                    elif msg_type is ERROR:
                         logger.error(f'ws连接错误 {ws.exception()}')
             finally:
-                logger.info(f"适配器 {adapter.adapter} 连接关闭")
+                logger.info(f"适配器 {adapter_name} 连接关闭")
             return ws
 
         app.router.add_get('/', ws_handler)
         
-        runner = web.AppRunner(app)
+        runner = web.AppRunner(app, access_log=None)
         await runner.setup()
         # 设置 reuse_port 和 reuse_address 以避免 TIME_WAIT 状态导致的端口占用问题
-        site = web.TCPSite(runner, host, port, reuse_port=True, reuse_address=True)
+        # TCP_NODELAY 由 asyncio 在接受连接时设置，这里只加大 accept 队列应对连接突增
+        site = web.TCPSite(runner, host, port, reuse_port=True, reuse_address=True, backlog=listen_backlog)
         await site.start()
         # 存储站点引用以便后续清理
         self.adapter_sites.append({
@@ -255,17 +371,43 @@ class TomatOSServer:
         })
         logger.info(f"适配器 {adapter.adapter} 监听在 ws://{host}:{port}")
 
+    async def dispatch_adapter_message(self, adapter_name, send_message, ws, msg_base):
+        """处理适配器收到的消息: 先尝试作为命令执行，否则交给 AI 聊天，回复通过适配器发回"""
+        # 1. 尝试作为命令执行 (仅针对文本消息)
+        if msg_base.text:
+            cmd_response = await self.bot_app.msg_handler.find_and_execute(msg_base.text)
+            if cmd_response:
+                logger.info(f"命令执行结果: {cmd_response}")
+                await self.send_adapter_reply(adapter_name, send_message, ws, cmd_response)
+                return
+
+        # 2. 转发给 bot_app 处理 (AI 聊天)
+        reply = await self.bot_app.handle_chat_message(msg_base)
+        if reply:
+            logger.info(f"Bot 回复: {reply}")
+            await self.send_adapter_reply(adapter_name, send_message, ws, reply)
+
+    async def send_adapter_reply(self, adapter_name, send_message, ws, text):
+        """通过适配器的 send_message 发送回复，适配器不支持发送时忽略"""
+        if send_message is not None:
+            await send_message(make_reply_message(adapter_name, text), ws)
+
     def generate_color(self, password, salt=""):
-        # 使用 sha256 生成哈希
-        h = hashlib.sha256((password + str(salt)).encode()).hexdigest()
+        # 使用 sha256 生成哈希, 只取前 8 字节转成 16 位十六进制 (颜色 + user_id 够用)
+        h = hashlib.sha256((password + str(salt)).encode()).digest()[:8].hex()
         # 取前6位作为颜色
         color = "#" + h[:6]
         return color, h
 
     async def handle_websocket(self, request):
         logger.info(f"收到 WebSocket 连接请求: {request.remote}")
+        # /ws 不经过中间件的爬虫检测, 在握手时检测一次
+        user_agent = request.headers.get('User-Agent', '')
+        if user_agent and is_bot(user_agent):
+            logger.warning(f"拦截爬虫请求: {user_agent} 来自 {request.remote}")
+            return bot_forbidden_response()
+
         ws = web.WebSocketResponse()
-        ws.headers['Server'] = get_server_header()
         await ws.prepare(request)
 
         # Store request object in ws for later use (e.g. logging IP)
@@ -274,29 +416,96 @@ class TomatOSServer:
         await self.register(ws, request.host)
         try:
             async for msg in ws:
-                logger.debug(f"接收到信息: {msg}")
-                if msg.type == aiohttp.WSMsgType.TEXT:
+                if logger.enable_debug_logging:
+                    logger.debug(f"接收到信息: {msg}")
+                if msg.type is aiohttp.WSMsgType.TEXT:
                     try:
-                        data = json.loads(msg.data)
+                        data = json_loads(msg.data)
                         await self.process_message(ws, data)
                     except json.JSONDecodeError:
                         pass
-                elif msg.type == aiohttp.WSMsgType.ERROR:
+                elif msg.type is aiohttp.WSMsgType.ERROR:
                     logger.error(f'ws连接错误 {ws.exception()}')
+                # 发送队列溢出或写任务出错时连接已被注销，不再处理后续消息
+                if ws not in self.clients:
+                    break
         finally:
             await self.unregister(ws)
+            # 等 drop_client 发起的关闭完成，否则处理函数返回时会以 1000 关闭，丢掉关闭码
+            closing_task = self.closing_tasks.get(ws)
+            if closing_task is not None:
+                await closing_task
         
         return ws
 
     async def register(self, ws, host):
-        self.clients[ws] = {"state": "init", "host": host}
+        client_state = ClientState(host)
+        client_state.send_waker = asyncio.get_running_loop().create_future()
+        client_state.writer_task = asyncio.create_task(self.writer_loop(ws, client_state))
+        self.clients[ws] = client_state
 
     async def unregister(self, ws):
-        if ws in self.clients:
-            del self.clients[ws]
+        self.drop_client(ws)
+
+    def drop_client(self, ws, close_code=None):
+        """注销连接并结束写任务；给出 close_code 时同时关闭 WebSocket"""
+        client_state = self.clients.pop(ws, None)
+        # 连接已关闭，队列里剩下的帧也发不出去了，直接结束写任务
+        if client_state is not None:
+            client_state.send_queue.clear()
+            if client_state.writer_task is not None and client_state.writer_task is not asyncio.current_task():
+                client_state.writer_task.cancel()
+        if close_code is not None and not ws.closed:
+            task = asyncio.create_task(ws.close(code=close_code))
+            self.closing_tasks[ws] = task
+            task.add_done_callback(lambda _: self.closing_tasks.pop(ws, None))
+
+    async def writer_loop(self, ws, client_state):
+        """每个连接一个写任务，把发送队列里的帧写到 socket，消息处理不用等待网络"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await client_state.send_waker
+            client_state.send_waker = loop.create_future()
+            queue = client_state.send_queue
+            # 一次攒了多帧时开启 TCP_CORK，让内核合并成尽量少的报文
+            corked = len(queue) > 1
+            if corked:
+                set_tcp_cork(ws, True)
+            try:
+                while queue:
+                    await send_text_frame(ws, queue.popleft())
+            except ConnectionError as e:
+                logger.debug(f"发送失败，连接已断开: {e}")
+                self.drop_client(ws)
+                return
+            except Exception as e:
+                # 写任务退出后后续消息都会堆在队列里，所以出任何错都要注销并关闭连接
+                logger.error(f"发送消息时出错，断开连接: {e}")
+                self.drop_client(ws, aiohttp.WSCloseCode.INTERNAL_ERROR)
+                return
+            finally:
+                if corked:
+                    set_tcp_cork(ws, False)
+
+    def send_payload(self, ws, payload):
+        """把已编码的消息帧 (UTF-8 JSON bytes) 放入连接的发送队列"""
+        client_state = self.clients.get(ws)
+        if client_state is None:
+            # 连接已注销
+            return
+        if len(client_state.send_queue) >= send_queue_limit:
+            logger.warning(f"客户端 {client_state.host} 接收过慢，发送队列已满，断开连接")
+            self.drop_client(ws, aiohttp.WSCloseCode.TRY_AGAIN_LATER)
+            return
+        client_state.send_queue.append(payload)
+        if not client_state.send_waker.done():
+            client_state.send_waker.set_result(None)
 
     async def process_message(self, ws, data):
-        client_state = self.clients[ws]
+        client_state = self.clients.get(ws)
+        if client_state is None:
+            # 连接已注销
+            return
         msg_type = data.get("type")
 
         if msg_type == "init":
@@ -305,156 +514,104 @@ class TomatOSServer:
             language = data.get("language", "zh-CN")
             logger.debug(f"连接用户的 userAgent: {user_agent}, 语言: {language}")
             
-            if "Win" in user_agent:
-                client_state["os"] = "Windows"
-            elif "Mac" in user_agent:
-                client_state["os"] = "macOS"
-            elif "Harmony" in user_agent:
-                client_state["os"] = "HarmonyOS"
-            elif "Android" in user_agent:
-                client_state["os"] = "Android"
-            elif "Linux" in user_agent:
-                client_state["os"] = "Linux"
-            else:
-                client_state["os"] = "Linux"
+            # 一次扫描找出所有出现的系统关键字，再按优先级取第一个
+            # (Android 的 UA 里也带 Linux，所以不能直接取最左边的匹配)
+            found = set(ua_os_regex.findall(user_agent))
+            client_state.os = next((os_name for keyword, os_name in ua_os_priority if keyword in found), "Linux")
             
-            client_state["language"] = language
+            client_state.language = language
             
             # 尝试提取设备名称
             device_name = "localhost"
-            if client_state["os"] == "HarmonyOS":
+            if client_state.os == "HarmonyOS":
                 # 尝试提取设备名称
-                match = re.search(r"(?:HarmonyOS|Android[^;]+);\s*([^;)]+)", user_agent)
+                match = ua_harmony_regex.search(user_agent)
                 if match:
                     parts = match.group(1).split("Build")[0].strip()
                     device_name = parts
-            elif client_state["os"] == "Android":
-                match = re.search(r"Android[^;]+;\s*([^;)]+)", user_agent)
+            elif client_state.os == "Android":
+                match = ua_android_regex.search(user_agent)
                 if match:
                     parts = match.group(1).split("Build")[0].strip()
                     device_name = parts
-            elif client_state["os"] == "macOS":
+            elif client_state.os == "macOS":
                 device_name = "macbook"
-            elif client_state["os"] == "Windows":
+            elif client_state.os == "Windows":
                 device_name = "PC"
             
             # 清理设备名称中的空格
-            device_name = re.sub(r'\s+', '-', device_name)
-            client_state["device_name"] = device_name
+            device_name = whitespace_regex.sub('-', device_name)
+            client_state.device_name = device_name
             
-            logger.info(f"检测到操作系统: {client_state['os']}, 设备名称: {device_name}")
+            logger.info(f"检测到操作系统: {client_state.os}, 设备名称: {device_name}")
 
             # 模拟本地 shell，显示 SSH 连接提示
-            os_type = client_state["os"]
-            host = client_state.get("host", "localhost")
+            os_type = client_state.os
+            host = client_state.host
             
+            outputs = []
             if os_type == "Windows":
-                if language.startswith("zh"):
-                    await self.send_output(ws, "Windows PowerShell")
-                    await self.send_output(ws, " ")
-                    await self.send_output(ws, "版权所有 (C) Microsoft Corporation。保留所有权利。")
-                    await self.send_output(ws, " ")
-                    await self.send_output(ws, "安装最新的 PowerShell，以获得新功能和改进！https://aka.ms/PSWindows")
-                    await self.send_output(ws, " ")
-                else:
-                    await self.send_output(ws, "Windows PowerShell")
-                    await self.send_output(ws, " ")
-                    await self.send_output(ws, "Copyright (C) Microsoft Corporation. All rights reserved.")
-                    await self.send_output(ws, " ")
-                    await self.send_output(ws, "Install the latest PowerShell for new features and improvements! https://aka.ms/PSWindows")
-                    await self.send_output(ws, " ")
-                
-                prompt = "PS C:\\Windows\\System32>"
-                cmd = f"ssh TomatOS@{host}"
-                await self.send_output(ws, f'<span class="prompt">{prompt}</span> <span class="command">{cmd}</span>')
-                
-            elif os_type == "macOS":
-                prompt = f"user@{device_name} ~ %"
-                cmd = f"ssh tomatos@{host}"
-                await self.send_output(ws, f'<span class="prompt">{prompt}</span> <span class="command">{cmd}</span>')
-                
-            elif os_type == "Linux":
-                prompt = "user@linux:~$"
-                cmd = f"ssh TomatOS@{host}"
-                await self.send_output(ws, f'<span class="prompt">{prompt}</span> <span class="command">{cmd}</span>')
-                
-            elif os_type == "Android":
-                prompt = f"user@{device_name}:/ $"
-                cmd = f"ssh -p 8022 tomatos@{host}"
-                await self.send_output(ws, f'<span class="prompt">{prompt}</span> <span class="command">{cmd}</span>')
+                outputs.extend(powershell_banner_payloads["zh" if language.startswith("zh") else "en"])
+
+            prompt_fmt, cmd_fmt = ssh_banner_formats[os_type]
+            prompt = prompt_fmt.format(device_name=device_name)
+            cmd = cmd_fmt.format(host=host)
+            outputs.append(output_payload(f'<span class="prompt">{prompt}</span> <span class="command">{cmd}</span>'))
 
-            elif os_type == "HarmonyOS":
-                prompt = f"user@{device_name}:/ $"
-                cmd = f"ssh -p 8022 tomatos@{host}"
-                await self.send_output(ws, f'<span class="prompt">{prompt}</span> <span class="command">{cmd}</span>')
+            await self.send_output_many(ws, outputs)
 
             #   开始登录流程
             await self.send_prompt(ws, "login as: ", is_password=False)
-            client_state["state"] = "login_user"
+            client_state.state = "login_user"
 
         elif msg_type == "input":
             content = data.get("content")
-            state = client_state["state"]
+            state = client_state.state
 
             if state == "login_user":
-                client_state["username"] = content
+                client_state.username = content
                 await self.send_prompt(ws, "password: ", is_password=True)
-                client_state["state"] = "login_pass"
+                client_state.state = "login_pass"
 
             elif state == "login_pass":
                 password_input = content
-                username_input = client_state.get("username")
+                username_input = client_state.username
                 
                 is_admin = False
                 login_success = False
                 
-                # 获取配置的用户名
-                target_username = uac.get_admin_username()
-                
                 # Case 1: 尝试 Admin 登录 (必须匹配管理员用户名)
-                if username_input == target_username:
-                    # 尝试分离 TOTP (假设最后6位是 TOTP)
-                    totp_secret = uac.get_totp_secret()
-                    
-                    if len(password_input) > 6:
-                        potential_pass = password_input[:-6]
-                        potential_code = password_input[-6:]
-                        
-                        # 验证密码部分
-                        pass_ok, _ = uac.verify_password(potential_pass)
-                        if pass_ok:
-                            # 验证 TOTP 部分
-                            totp = pyotp.TOTP(totp_secret)
-                            if totp.verify(potential_code): # 使用 verify 方法更安全，允许一定的时间偏差
-                                is_admin = True
-                                login_success = True
-                                logger.warning(f"管理员登录成功: {username_input} 来自 {ws._req.remote}")
+                # 只有这里需要把密码拆成 密码 + TOTP，访客登录不做切分
+                if username_input == self.admin_username:
+                    # 假设最后6位是 TOTP
+                    if self.totp is not None and len(password_input) > 6:
+                        # 先验证密码部分，再验证 TOTP 部分 (verify 允许一定的时间偏差)
+                        # scrypt 校验需要几十毫秒，放到线程里执行，不阻塞其他连接
+                        pass_ok, _ = await asyncio.to_thread(uac.verify_password, password_input[:-6])
+                        if pass_ok and self.totp.verify(password_input[-6:]):
+                            is_admin = True
+                            login_success = True
+                            # 管理员也生成一个 user_id (使用用户名作为种子)
+                            _, client_state.user_id = self.generate_color(username_input, self.color_salt)
+                            logger.warning(f"管理员登录成功: {username_input} 来自 {ws._req.remote}")
                 else:
                     # Case 2: 访客登录 (忽略密码)
-                    is_admin = False
                     login_success = True
                     
                     # 生成访客颜色
-                    salt = uac.config.get("salt", "default_salt") if uac.config else "default_salt"
                     # 如果密码为空，使用用户名作为种子，避免空密码颜色都一样
                     seed = password_input if password_input else username_input
-                    color, h = self.generate_color(seed, salt)
-                    client_state["username_color"] = color
-                    client_state["user_id"] = h[:16]
+                    color, h = self.generate_color(seed, self.color_salt)
+                    client_state.username_color = color
+                    client_state.user_id = h
                     
                     logger.info(f"访客登录成功(忽略密码): {username_input} 来自 {ws._req.remote}")
 
                 if login_success:
-                    client_state["auth_level"] = "admin" if is_admin else "guest"
-                    
-                    # 如果是管理员，也生成一个 user_id (使用用户名作为种子)
-                    if is_admin:
-                        salt = uac.config.get("salt", "default_salt") if uac.config else "default_salt"
-                        _, h = self.generate_color(username_input, salt)
-                        client_state["user_id"] = h[:16]
+                    client_state.auth_level = "admin" if is_admin else "guest"
 
                     # 设置客户端 OS 类型
-                    client_state["os"] = "Linux"  # 默认使用 Linux shell
+                    client_state.os = "Linux"  # 默认使用 Linux shell
                     
                     if is_admin:
                         await self.send_output(ws, f'\nAuthentication successful. 欢迎回家 <span style="color: #ff4444; font-weight: bold;">[ADMIN]</span>\n {username_input}')
@@ -462,7 +619,7 @@ class TomatOSServer:
                         await self.send_output(ws, "\nAuthentication successful. Welcome to TomatOS. meow ~\n")
                         
                     await self.show_welcome_screen(ws, client_state)
-                    client_state["state"] = "shell"
+                    client_state.state = "shell"
                     
                     prompt = self.get_prompt(client_state)
                     await self.send_prompt(ws, prompt, is_password=False)
@@ -470,7 +627,7 @@ class TomatOSServer:
                     logger.warning(f"登录失败: {username_input} 来自 {ws._req.remote}")
                     await self.send_output(ws, "\nAccess Denied.\n")
                     await self.send_prompt(ws, "login as: ", is_password=False)
-                    client_state["state"] = "login_user"
+                    client_state.state = "login_user"
 
             elif state == "shell": 
                 result = await self.command_handler.process_command(ws, content)
@@ -479,9 +636,9 @@ class TomatOSServer:
                     await self.send_prompt(ws, prompt, is_password=False)
 
     def get_prompt(self, client_state):
-        state = client_state.get("state")
-        username = client_state.get("username", "user")
-        auth_level = client_state.get("auth_level", "guest")
+        state = client_state.state
+        username = client_state.username
+        auth_level = client_state.auth_level
         
         # 如果已登录（shell 状态），显示远程服务器提示符（Linux 风格）
         if state == "shell":
@@ -491,7 +648,7 @@ class TomatOSServer:
             if auth_level == "admin":
                 user_span = f'<span class="username-admin">{username}</span>'
             else:
-                color = client_state.get("username_color")
+                color = client_state.username_color
                 if color:
                     user_span = f'<span style="color: {color}; font-weight: bold;">{username}</span>'
                 else:
@@ -500,23 +657,15 @@ class TomatOSServer:
             return f'{user_span}@<span class="hostname">TomatOS</span>:~{symbol} '
 
         # Otherwise, show the local simulated prompt
-        os_type = client_state.get("os", "Linux")
-        device_name = client_state.get("device_name", "localhost")
+        os_type = client_state.os
+        device_name = client_state.device_name
         
-        if os_type == "Windows":
-            return f"PS C:\\Windows\\System32> "
-        elif os_type == "macOS":
-            return f"{username}@{device_name} ~ % "
-        elif os_type == "Android":
-            return f"{username}@{device_name}:/ $ "
-        elif os_type == "HarmonyOS":
-            return f"{username}@{device_name}:/ $ "
-        else:
-            return f"{username}@TomatOS:~$ "
+        return local_prompt_formats.get(os_type, local_prompt_formats["Linux"])(username, device_name)
         
     def get_system_info(self):
+        # platform.uname() 标准库内部已缓存
         uname = platform.uname()
-        uptime = psutil.boot_time()
+        uptime, _, _ = get_cached_system_info()
         return uname, uptime
 
     async def handle_bot_chat(self, ws, text):
@@ -532,11 +681,15 @@ class TomatOSServer:
             await self.send_output(ws, f'<span class="prompt">{bot_prompt}</span> <span class="output">{cmd_response}</span>')
             return
 
-        client_state = self.clients[ws]
-        username = client_state.get("username", "user")
-        user_id = client_state.get("user_id", "unknown")
+        client_state = self.clients.get(ws)
+        if client_state is None:
+            # 等待命令执行期间连接已注销
+            return
+        username = client_state.username
+        user_id = client_state.user_id
         
         # 构造消息
+        now = int(time.time())
         msg_obj = {
             "adapter": "TomatOS_WebTerminal",
             "text": text,
@@ -546,8 +699,8 @@ class TomatOSServer:
             "audio": [],
             "at": [],
             "reply_to": None,
-            "timestamp": int(datetime.now().timestamp()),
-            "messageid": str(int(datetime.now().timestamp())),
+            "timestamp": now,
+            "messageid": str(now),
             "userid": user_id, 
             "username": username,
             "usercard": "",
@@ -571,64 +724,40 @@ class TomatOSServer:
             await self.send_output(ws, f"Bot Error: {str(e)}\n")
 
     async def send_output(self, ws, content, class_name="line"):
-        await ws.send_str(json.dumps({
-            "type": "output",
-            "content": content,
-            "className": class_name
-        }))
+        self.send_payload(ws, output_payload(content, class_name))
 
     async def send_prompt(self, ws, content, is_password=False):
-        await ws.send_str(json.dumps({
+        self.send_payload(ws, json_dumps({
             "type": "prompt",
             "content": content,
             "isPassword": is_password
         }))
 
+    async def send_output_many(self, ws, payloads):
+        """连续发送多条已编码的输出 (见 output_payload)，写任务会一次性发出"""
+        for payload in payloads:
+            self.send_payload(ws, payload)
+
     async def show_welcome_screen(self, ws, client_state):
-        username = client_state.get("username", "user")
-        os_type = client_state.get("os", "Linux")
+        username = client_state.username
+        os_type = client_state.os
         uname, uptime = self.get_system_info()
 
-        await self.send_output(ws, f'<div class="welcome-line">欢迎来到 TomatOS 喵~</div>')
+        # 欢迎语和 ASCII 字符画是固定内容，直接用预先编码好的帧
+        outputs = list(welcome_payloads)
 
-        welcome_msg = """
-  _______                     _    ____   _____ 
- |__   __|                   | |  / __ \\ / ____|
-    | | ___  _ __ ___   __ _ | |_| |  | | (___  
-    | |/ _ \\| '_ ` _ \\ / _` || __| |  | |\\___ \\ 
-    | | (_) | | | | | | (_| || |_| |__| |____) |
-    |_|\\___/|_| |_| |_|\\__,_||\\__|\\____/|_____/ 
-"""
-        await self.send_output(ws, welcome_msg, "ascii-art")
-
-
-        await self.send_output(ws, f'<span class="prompt"><span class="username">{username}</span>@<span class="hostname">TomatOS</span>:~$</span> <span class="command">uname -a</span>')
-        await self.send_output(ws, f'<span class="output">{uname.system} {uname.node} {uname.release} {uname.version} {uname.machine} {"GNU/Linux" if uname.system != "Windows" else ""}</span>')
-        
-        await self.send_output(ws, f'<span class="prompt"><span class="username">{username}</span>@<span class="hostname">TomatOS</span>:~$</span> <span class="command">whoami && hostname</span>')
-        await self.send_output(ws, f'<span class="output">{username}<br>TomatOS</span>')
+        outputs.append(output_payload(f'<span class="prompt"><span class="username">{username}</span>@<span class="hostname">TomatOS</span>:~$</span> <span class="command">uname -a</span>'))
+        outputs.append(output_payload(f'<span class="output">{uname.system} {uname.node} {uname.release} {uname.version} {uname.machine} {"GNU/Linux" if uname.system != "Windows" else ""}</span>'))
         
-        await self.send_output(ws, f'<span class="prompt"><span class="username">{username}</span>@<span class="hostname">TomatOS</span>:~$</span> <span class="command">uptime</span>')
+        outputs.append(output_payload(f'<span class="prompt"><span class="username">{username}</span>@<span class="hostname">TomatOS</span>:~$</span> <span class="command">whoami && hostname</span>'))
+        outputs.append(output_payload(f'<span class="output">{username}<br>TomatOS</span>'))
         
-        # 计算系统运行时间
-        boot_dt = datetime.fromtimestamp(psutil.boot_time())
-        now_dt = datetime.now()
-        delta = now_dt - boot_dt
-        days = delta.days
-        hours, rem = divmod(delta.seconds, 3600)
-        minutes, _ = divmod(rem, 60)
-        uptime_str = f"up {days} days, {hours}:{minutes:02}" if days else f"up {hours}:{minutes:02}"
-        
-        # 获取系统负载和用户数
-        try:
-            load = psutil.getloadavg()
-        except (AttributeError, OSError):
-            load = (0.0, 0.0, 0.0)
-            
-        users = len(psutil.users())
+        outputs.append(output_payload(f'<span class="prompt"><span class="username">{username}</span>@<span class="hostname">TomatOS</span>:~$</span> <span class="command">uptime</span>'))
         
-        output = f"{now_dt.strftime('%H:%M:%S')} {uptime_str},  {users} user{'s' if users!=1 else ''},  load average: {load[0]:.2f}, {load[1]:.2f}, {load[2]:.2f}"
-        await self.send_output(ws, f'<span class="output">{output}</span>')
+        # 开机时间、系统负载和用户数带缓存
+        outputs.append(output_payload(f'<span class="output">{format_uptime()}</span>'))
+
+        await self.send_output_many(ws, outputs)
 
     async def cleanup_adapters(self):
         """清理所有适配器站点"""
@@ -636,99 +765,167 @@ class TomatOSServer:
             return
             
         logger.info(f"正在清理 {len(self.adapter_sites)} 个适配器站点...")
-        for site_info in self.adapter_sites:
-            try:
-                adapter_name = site_info['adapter']
-                site = site_info['site']
-                runner = site_info['runner']
-                
-                logger.info(f"停止适配器 {adapter_name} 站点...")
-                await site.stop()
-                await runner.cleanup()
-                logger.info(f"适配器 {adapter_name} 已停止")
-            except Exception as e:
-                logger.error(f"停止适配器 {site_info.get('adapter', 'unknown')} 时出错: {e}")
+        # 各站点互不依赖，同时停止
+        await asyncio.gather(*(self.stop_adapter_site(site_info) for site_info in self.adapter_sites))
         
         self.adapter_sites.clear()
         logger.info("所有适配器站点已清理")
 
+    async def stop_adapter_site(self, site_info):
+        """停止单个适配器站点，出错只记录日志"""
+        adapter_name = site_info.get('adapter', 'unknown')
+        try:
+            logger.info(f"停止适配器 {adapter_name} 站点...")
+            await site_info['site'].stop()
+            await site_info['runner'].cleanup()
+            logger.info(f"适配器 {adapter_name} 已停止")
+        except Exception as e:
+            logger.error(f"停止适配器 {adapter_name} 时出错: {e}")
+
     def startup():
         pass
 
 
+# 常见爬虫关键字, 编译成一个忽略大小写的正则, 一次扫描完成匹配
+bot_keywords = ('bot', 'crawl', 'spider', 'slurp', 'scanner', 'curl', 'wget')
+bot_regex = re.compile('|'.join(bot_keywords), re.IGNORECASE)
+
+@functools.lru_cache(maxsize=2048)
+def is_bot(user_agent):
+    """简单的反爬虫/扫描器检测, 按 User-Agent 缓存结果 (关键字变更后需 is_bot.cache_clear())"""
+    return bot_regex.search(user_agent) is not None
+
+# 403 响应内容是固定的, 预先编码
+bot_forbidden_body = f"⭐{bot_name}@TomatOS: [403]请求被{bot_name}吃掉了......\n(Permission Denied: Your request has been ate by {bot_name}.)".encode()
+
+def bot_forbidden_response():
+    return web.Response(status=403, body=bot_forbidden_body, content_type="text/plain", charset="utf-8")
+
+async def send_text_frame(ws, payload):
+    """把 UTF-8 编码好的 payload 作为文本帧发出"""
+    if ws_send_frame_supported:
+        await ws.send_frame(payload, aiohttp.WSMsgType.TEXT)
+    else:
+        await ws.send_str(payload.decode())
+
+def set_tcp_cork(ws, enabled):
+    """开关连接上的 TCP_CORK (仅 Linux 支持)，关闭时内核立即发出积攒的数据"""
+    if not hasattr(socket, "TCP_CORK"):
+        return
+    request = getattr(ws, "_req", None)
+    transport = request.transport if request is not None else None
+    if transport is None:
+        return
+    sock = transport.get_extra_info("socket")
+    if sock is None:
+        return
+    try:
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_CORK, 1 if enabled else 0)
+    except (OSError, AttributeError):
+        pass
+
+def load_index_page():
+    """读取首页到内存，返回 (内容, ETag)；文件不存在时返回 None"""
+    try:
+        body = index_path.read_bytes()
+    except OSError as e:
+        logger.warning(f"无法读取首页 {index_path}: {e}")
+        return None
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
 async def index(request):
-    logger.info(f"收到 HTTP 访问请求: {request.remote}")
-    return web.FileResponse(os.path.join(os.path.dirname(__file__), 'web', 'index.html'))
-
-async def logging_middleware(app, handler):
-    async def middleware_handler(request):
-        # 简单的反爬虫/扫描器检测
-        user_agent = request.headers.get('User-Agent', '').lower()
-        # 常见爬虫关键字
-        bot_keywords = ['bot', 'crawl', 'spider', 'slurp', 'scanner', 'curl', 'wget']
-        
-        # 如果是爬虫，直接返回 403
-        if any(keyword in user_agent for keyword in bot_keywords):
-            logger.warning(f"拦截爬虫请求: {user_agent} 来自 {request.remote}")
-            return web.Response(status=403, text=f"⭐{bot_name}@TomatOS: [403]请求被{bot_name}吃掉了......\n(Permission Denied: Your request has been ate by {bot_name}.)")
+    page = request.app['index_page']
+    if page is None:
+        return web.FileResponse(index_path)
+    body, etag = page
+    headers = {'ETag': etag, 'Cache-Control': 'public, max-age=60'}
+    if request.headers.get('If-None-Match') == etag:
+        return web.Response(status=304, headers=headers)
+    return web.Response(body=body, content_type='text/html', charset='utf-8', headers=headers)
+
+@web.middleware
+async def logging_middleware(request, handler):
+    # WebSocket 升级请求直接交给处理函数, 爬虫检测在 handle_websocket 里做一次
+    path = request.path
+    if path == '/ws':
+        return await handler(request)
+    # 静态资源 (js/css/图片等) 不做检测和日志, 页面本身仍由 index 路由处理
+    if isinstance(request.match_info.route.resource, web.StaticResource):
+        return await handler(request)
+
+    # 请求属性只取一次
+    user_agent = request.headers.get('User-Agent', '')
+    remote = request.remote
+    method = request.method
+
+    # 简单的反爬虫/扫描器检测
+    # 如果是爬虫，直接返回 403
+    if user_agent and is_bot(user_agent):
+        logger.warning(f"拦截爬虫请求: {user_agent} 来自 {remote}")
+        return bot_forbidden_response()
 
-        logger.info(f"请求: {request.method} {request.path} 来自 {request.remote}")
-        response = await handler(request)
-        if not response.prepared:
-            response.headers['Server'] = get_server_header()
-        return response
-    return middleware_handler
+    # 每个请求都会走到这里，只在开启 debug 日志时才格式化
+    if logger.enable_debug_logging:
+        logger.debug(f"请求: {method} {path} 来自 {remote}")
+    return await handler(request)
 
-async def console_input_loop(server: TomatOSServer):
+async def set_server_header(request, response):
+    """on_response_prepare 信号: 所有响应 (包括 WebSocket 握手) 在发送前设置 Server 头"""
+    response.headers['Server'] = request.app['server_header']
+
+# 控制台输出专用线程, 单线程保证输出顺序, 慢终端/管道不会卡住事件循环
+console_output_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="console_output")
+
+def write_console(text, chunk_size=64 * 1024):
+    """同步写入 stdout, 大段文本分块写入"""
+    for i in range(0, len(text), chunk_size):
+        sys.stdout.write(text[i:i + chunk_size])
+    sys.stdout.flush()
+
+def start_console_reader(loop, queue):
+    """启动读取 stdin 的守护线程: 每读到一行就投递到事件循环的队列里，EOF 时投递 None"""
+    def reader():
+        while True:
+            try:
+                line = sys.stdin.readline()
+            except (OSError, ValueError):
+                # stdin 被关闭，按 EOF 处理
+                line = ""
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, line.rstrip('\n') if line else None)
+            except RuntimeError:
+                # 事件循环已关闭
+                return
+            if not line:
+                return
+
+    threading.Thread(target=reader, name="console_input", daemon=True).start()
+
+async def console_input_loop(server: TomatOSServer, stop_event):
     """控制台输入循环"""
+    loop = asyncio.get_running_loop()
+    # 阻塞的 readline 交给一个常驻线程，这里只等待队列，没有输入时不会被唤醒
+    queue = asyncio.Queue()
+    start_console_reader(loop, queue)
     logger.info("控制台输入已就绪")
     try:
         while True:
-            # 使用 asyncio 创建异步输入任务
-            loop = asyncio.get_event_loop()
-            
-            # 创建一个 Future 来等待输入
-            future = loop.create_future()
-            
-            def on_input_ready():
-                try:
-                    line = sys.stdin.readline()
-                    if not line:
-                        future.set_exception(EOFError())
-                    else:
-                        future.set_result(line.rstrip('\n'))
-                except Exception as e:
-                    future.set_exception(e)
-            
-            # 在单独的线程中读取输入
-            loop.run_in_executor(None, on_input_ready)
-            
-            try:
-                # 等待输入或取消
-                cmd = await asyncio.wait_for(future, timeout=0.1)
-            except asyncio.TimeoutError:
-                # 超时，继续循环以检查取消
-                continue
-            except asyncio.CancelledError:
-                # 任务被取消，退出循环
-                logger.info("控制台输入循环被取消")
-                break
-            except EOFError:
+            cmd = await queue.get()
+            if cmd is None:
                 logger.info("检测到 EOF，退出控制台输入循环")
                 break
-            
+
             if cmd:
                 if cmd.lower() in ["exit", "quit"]:
                     # 发送停止信号到主循环
                     logger.info("收到退出命令，正在关闭服务器...")
-                    # 这里我们无法直接停止服务器，但可以记录日志
-                    print("\n请使用 Ctrl+C 关闭服务器")
-                    continue
+                    stop_event.set()
+                    break
                 
                 # Pass to bot
                 res = await server.bot_app.handle_console_input(cmd)
                 if res:
-                    print(res)
+                    await loop.run_in_executor(console_output_executor, write_console, f"{res}\n")
     except asyncio.CancelledError:
         logger.info("控制台输入循环被取消")
         raise
@@ -738,21 +935,45 @@ async def console_input_loop(server: TomatOSServer):
 
 async def on_startup(app):
     server = app['server']
+    # 适配器列表在 bot 启动时才初始化，所以 bot 必须先启动
     await server.start_bot()
     await server.start_adapters()
     # Start console loop in background
-    asyncio.create_task(console_input_loop(server))
+    # 保留任务的强引用，避免被 GC 回收导致异常丢失
+    task = asyncio.create_task(console_input_loop(server, app['stop_event']))
+    background_tasks = app['background_tasks']
+    background_tasks.add(task)
+    task.add_done_callback(lambda t: on_background_task_done(background_tasks, t))
+
+def on_background_task_done(background_tasks, task):
+    background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"后台任务 {task.get_coro().__name__} 异常退出: {task.exception()!r}")
+
+async def on_cleanup(app):
+    """关闭时取消所有后台任务"""
+    background_tasks = app['background_tasks']
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
 
 async def main_async():
     """异步主函数"""
     server = TomatOSServer()
     app = web.Application(middlewares=[logging_middleware])
     app['server'] = server
+    app['background_tasks'] = set()
+    # 首页只有一个文件，启动时读入内存，不用每次请求都 stat/open
+    app['index_page'] = load_index_page()
+    # Server 头每次启动随机选一个，之后所有响应共用
+    app['server_header'] = get_server_header()
+    # 设置后主协程结束等待，进入清理流程
+    stop_event = asyncio.Event()
+    app['stop_event'] = stop_event
     app.on_startup.append(on_startup)
-    
-    # 获取 web 目录的绝对路径
-    web_dir = os.path.join(os.path.dirname(__file__), 'web')
-    
+    app.on_cleanup.append(on_cleanup)
+    app.on_response_prepare.append(set_server_header)
+
     app.add_routes([
         web.get('/', index),
         web.get('/ws', server.handle_websocket),
@@ -764,15 +985,24 @@ async def main_async():
     print(f"服务器启动喵~ 监听端口: http://0.0.0.0:8765 (PID: {self_pid})")
     
     # 创建 runner 以便我们可以控制关闭过程
-    runner = web.AppRunner(app)
+    # 请求日志已由 logging_middleware 输出，关闭 aiohttp 自带的访问日志
+    runner = web.AppRunner(app, access_log=None)
     await runner.setup()
-    site = web.TCPSite(runner, '0.0.0.0', 8765)
+    site = web.TCPSite(runner, '0.0.0.0', 8765, backlog=listen_backlog)
     await site.start()
     
+    # POSIX 上由信号处理器触发正常关闭; Windows 不支持 add_signal_handler，
+    # Ctrl+C 仍以 KeyboardInterrupt 的形式由 main() 处理
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+
     try:
-        # 保持服务器运行
-        while True:
-            await asyncio.sleep(1)
+        # 保持服务器运行，直到收到关闭信号或控制台 exit 命令
+        await stop_event.wait()
     except asyncio.CancelledError:
         # 收到取消信号，开始清理
         pass
@@ -785,6 +1015,10 @@ async def main_async():
 
 def main():
     """同步主函数"""
+    # 有 uvloop 就用 uvloop 的事件循环
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+
     # 创建事件循环
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
@@ -794,6 +1028,7 @@ def main():
         main_task = loop.create_task(main_async())
         loop.run_until_complete(main_task)
     except KeyboardInterrupt:
+        # 没有信号处理器时 (Windows，或启动完成之前) 才会走到这里
         print("\n收到关闭信号，正在优雅关闭...")
         # 取消所有任务
         tasks = asyncio.all_tasks(loop)
@@ -810,6 +1045,9 @@ def main():
         print(f"服务器运行出错: {e}")
         loop.close()
         raise
+    else:
+        # 通过 stop_event 正常关闭
+        loop.close()
 
 def test():
 
@@ -8,6 +8,7 @@ import setup_uac
 import sys
 import subprocess
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 def merge_split_files():
     """合并拆分的大文件"""
@@ -29,8 +30,11 @@ def main():
     merge_split_files()
 
     # TOTP 初始化
+    # 二维码 PNG 的渲染放到后台线程，和下面等待用户输入的过程重叠
+    qr_executor = ThreadPoolExecutor(max_workers=1)
+    qr_future = None
     try:
-        setup_totp.generate_totp_config()
+        qr_future = setup_totp.generate_totp_config(qr_executor)
     except Exception as e:
         logger.exception(f"TOTP 配置失败: {e}")
     logger.info("TOTP 配置完成。")
@@ -48,6 +52,14 @@ def main():
     choice_run = input().strip().lower()
     logger.info(f"需要在完成时销毁初始化脚本吗？ (y/n): ")
     choice_destroy = input().strip().lower()
+
+    # 确认二维码图片已经保存
+    if qr_future is not None:
+        try:
+            qr_future.result()
+        except Exception as e:
+            logger.exception(f"二维码图片保存失败: {e}")
+    qr_executor.shutdown()
     
     # 先处理服务器启动
     if choice_run == 'y':
@@ -61,11 +73,18 @@ def main():
             logger.info("请确保 server.py 文件存在于同一目录中。")
             return
         
-        # 新开一个无关联的控制台进程运行服务器
+        # 新开一个无关联的进程运行服务器，直接启动解释器，不经过 shell
+        server_dir = os.path.dirname(server_path)
         if os.name == 'nt':  # Windows
-            subprocess.Popen(['start', 'cmd', '/k', f'python "{server_path}"'], shell=True)
+            # 在新的控制台窗口中运行
+            subprocess.Popen([sys.executable, server_path], cwd=server_dir,
+                             creationflags=subprocess.CREATE_NEW_CONSOLE, close_fds=True)
         else:  # macOS/Linux
-            subprocess.Popen(['nohup', 'python3', f'"{server_path}"', '&'])
+            # 相当于 nohup: 脱离当前会话，输出追加到 nohup.out
+            with open(os.path.join(server_dir, "nohup.out"), "ab") as out:
+                subprocess.Popen([sys.executable, server_path], cwd=server_dir,
+                                 stdin=subprocess.DEVNULL, stdout=out, stderr=subprocess.STDOUT,
+                                 start_new_session=True, close_fds=True)
         logger.info("服务器已启动。")
     else:
         logger.info("跳过服务器启动。")
@@ -11,7 +11,20 @@ import hashlib
 import subprocess
 import platform
 import shutil
+import queue
+import threading
+import functools
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+
+# 有 orjson 就用 orjson 解析拆分信息
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    json_loads = json.loads
 
 # 尝试导入 logger，如果失败则使用 print
 try:
@@ -24,6 +37,100 @@ except ImportError:
     def log_warning(msg): print(f"[WARN] {msg}")
     def log_error(msg): print(f"[ERROR] {msg}")
 
+# Linux 上 os.sendfile 支持输出到普通文件，拷贝在内核里完成
+use_sendfile = sys.platform.startswith("linux") and hasattr(os, "sendfile")
+
+def append_file(out_f, src_path, buffer_size=1024 * 1024):
+    """把 src_path 的全部内容追加写入已打开的 out_f"""
+    with open(src_path, "rb") as in_f:
+        if use_sendfile:
+            out_f.flush()
+            in_fd = in_f.fileno()
+            out_fd = out_f.fileno()
+            sent_total = 0
+            try:
+                while True:
+                    sent = os.sendfile(out_fd, in_fd, None, 1 << 30)
+                    if sent == 0:
+                        return
+                    sent_total += sent
+            except OSError:
+                # 部分文件系统不支持 sendfile，还没写入数据时退回普通拷贝
+                if sent_total:
+                    raise
+        shutil.copyfileobj(in_f, out_f, buffer_size)
+
+def pipelined_concat(out_f, src_paths, on_file_done=None, buffer_size=1024 * 1024, depth=4):
+    """后台线程按顺序读取 src_paths，当前线程写入 out_f，读和写同时进行
+
+    每个文件读完后在当前线程调用 on_file_done(文件序号)。
+    """
+    blocks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(item):
+        # 写入方出错退出后不再阻塞在满队列上
+        while not stop.is_set():
+            try:
+                blocks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def reader():
+        try:
+            for index, src_path in enumerate(src_paths):
+                with open(src_path, "rb") as in_f:
+                    while True:
+                        data = in_f.read(buffer_size)
+                        if not data:
+                            break
+                        if not put(data):
+                            return
+                if not put(index):
+                    return
+            put(None)
+        except Exception as e:
+            put(e)
+
+    thread = threading.Thread(target=reader, name="merge_reader", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = blocks.get()
+            if item is None:
+                return
+            if isinstance(item, bytes):
+                out_f.write(item)
+            elif isinstance(item, int):
+                if on_file_done:
+                    on_file_done(item)
+            else:
+                raise item
+    finally:
+        stop.set()
+        thread.join()
+
+@functools.lru_cache(maxsize=1)
+def find_sevenzip():
+    """查找系统中已安装的 7-Zip，结果在进程内缓存"""
+    if os.name == "nt":
+        found = shutil.which("7z.exe")
+        if found:
+            return Path(found)
+        # 7-Zip 安装程序默认不加入 PATH，再检查默认安装目录
+        possible_paths = [
+            Path(os.environ.get("ProgramFiles", "C:\\Program Files")) / "7-Zip" / "7z.exe",
+            Path(os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")) / "7-Zip" / "7z.exe",
+        ]
+        for path in possible_paths:
+            if path.exists():
+                return path
+        return None
+    found = shutil.which("7z")
+    return Path(found) if found else None
+
 class StandaloneMerger:
     def __init__(self):
         self.system = platform.system().lower()
@@ -31,41 +138,27 @@ class StandaloneMerger:
 
     def _find_sevenzip(self):
         """查找系统中已安装的 7-Zip"""
-        if self.system == "windows":
-            possible_paths = [
-                Path("C:\\Program Files\\7-Zip\\7z.exe"),
-                Path("C:\\Program Files (x86)\\7-Zip\\7z.exe"),
-                Path(os.environ.get("ProgramFiles", "C:\\Program Files")) / "7-Zip" / "7z.exe",
-                Path(os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")) / "7-Zip" / "7z.exe",
-            ]
-            for path_dir in os.environ.get("PATH", "").split(os.pathsep):
-                possible_paths.append(Path(path_dir) / "7z.exe")
-            
-            for path in possible_paths:
-                if path.exists():
-                    return path
-        elif self.system in ["linux", "darwin"]:
-            try:
-                result = subprocess.run(["which", "7z"], capture_output=True, text=True)
-                if result.returncode == 0:
-                    return Path(result.stdout.strip())
-            except:
-                pass
-        return None
+        return find_sevenzip()
 
     def _calculate_file_hash(self, file_path):
         """计算文件的 SHA256 哈希值"""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
+        # 只用于校验完整性，不涉及安全
+        sha256_hash = hashlib.sha256(usedforsecurity=False)
+        # 1MB 缓冲区反复复用，每次 readinto 不再分配新的 bytes
+        buffer = bytearray(1024 * 1024)
+        view = memoryview(buffer)
+        with open(file_path, "rb", buffering=0) as f:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                sha256_hash.update(view[:size])
         return sha256_hash.hexdigest()
 
     def merge_file(self, info_file_path):
         """合并文件"""
         try:
-            with open(info_file_path, "r", encoding="utf-8") as f:
-                split_info = json.load(f)
+            split_info = json_loads(info_file_path.read_bytes())
             
             base_dir = info_file_path.parent
             original_file = base_dir / split_info["original_file"]
@@ -163,33 +256,39 @@ class StandaloneMerger:
             else:
                 return False
 
+            # 先确认所有分块都在，避免写出不完整的文件
+            chunk_paths = []
+            for chunk in chunks:
+                chunk_path = base_dir / chunk[file_key]
+                if not chunk_path.exists():
+                    log_error(f"找不到分块文件: {chunk_path.name}")
+                    return False
+                chunk_paths.append(chunk_path)
+
             total_size = split_info.get("original_size", 0)
             processed_size = 0
+
+            def report_progress(index):
+                # 简单的进度显示
+                nonlocal processed_size
+                chunk = chunks[index]
+                if "chunk_size" in chunk:
+                    processed_size += chunk["chunk_size"]
+                elif "volume_size" in chunk:
+                    processed_size += chunk["volume_size"]
+
+                if total_size > 0:
+                    percent = (processed_size / total_size) * 100
+                    print(f"\r合并进度: {percent:.1f}%", end="", flush=True)
             
             with open(output_path, "wb") as out_f:
-                for i, chunk in enumerate(chunks):
-                    chunk_path = base_dir / chunk[file_key]
-                    if not chunk_path.exists():
-                        log_error(f"找不到分块文件: {chunk_path.name}")
-                        return False
-                    
-                    with open(chunk_path, "rb") as in_f:
-                        # 大文件分块读取写入，避免内存溢出
-                        while True:
-                            data = in_f.read(1024 * 1024) # 1MB buffer
-                            if not data:
-                                break
-                            out_f.write(data)
-                    
-                    # 简单的进度显示
-                    if "chunk_size" in chunk:
-                        processed_size += chunk["chunk_size"]
-                    elif "volume_size" in chunk:
-                        processed_size += chunk["volume_size"]
-                    
-                    if total_size > 0:
-                        percent = (processed_size / total_size) * 100
-                        print(f"\r合并进度: {percent:.1f}%", end="", flush=True)
+                if use_sendfile:
+                    for i, chunk_path in enumerate(chunk_paths):
+                        append_file(out_f, chunk_path)
+                        report_progress(i)
+                else:
+                    # 没有 sendfile 时用后台线程预读下一块，读盘和写盘重叠
+                    pipelined_concat(out_f, chunk_paths, report_progress)
             
             print() # 换行
             return True
@@ -199,21 +298,45 @@ class StandaloneMerger:
                 output_path.unlink()
             return False
 
+# 扫描时不进入的目录
+excluded_dirs = frozenset(['venv', '.venv', '__pycache__', '.git', 'node_modules'])
+
+def iter_split_infos(root):
+    """遍历 root 下的拆分信息文件，排除的目录不会进入"""
+    stack = [root]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in excluded_dirs:
+                            stack.append(entry.path)
+                    elif entry.name.endswith('.split_info.json') or entry.name == 'split_info.json':
+                        yield Path(entry.path)
+        except OSError as e:
+            log_warning(f"无法读取目录: {e}")
+
+@functools.lru_cache(maxsize=1)
+def get_merger():
+    """每个进程共用一个 StandaloneMerger"""
+    return StandaloneMerger()
+
+def merge_one(info_file):
+    """合并单个拆分文件 (进程池任务，必须是模块级函数)"""
+    try:
+        return get_merger().merge_file(info_file)
+    except Exception as e:
+        log_error(f"处理 {info_file.name} 时出错: {e}")
+        return False
+
 def merge_split_files_on_setup():
     """在安装时自动合并拆分文件"""
     log_info("检查并合并拆分的大文件...")
     
     project_root = Path(__file__).parent
-    merger = StandaloneMerger()
     
     # 扫描拆分信息文件
-    split_info_files = []
-    for root, dirs, files in os.walk(project_root):
-        if any(d in root for d in ['venv', '__pycache__', '.git', 'node_modules']):
-            continue
-        for file in files:
-            if file.endswith('.split_info.json') or file == 'split_info.json':
-                split_info_files.append(Path(root) / file)
+    split_info_files = list(iter_split_infos(project_root))
     
     if not split_info_files:
         log_info("未找到拆分文件，跳过合并步骤")
@@ -221,13 +344,15 @@ def merge_split_files_on_setup():
     
     log_info(f"找到 {len(split_info_files)} 个拆分文件需要合并")
     
-    success_count = 0
-    for info_file in split_info_files:
-        try:
-            if merger.merge_file(info_file):
-                success_count += 1
-        except Exception as e:
-            log_error(f"处理 {info_file.name} 时出错: {e}")
+    if len(split_info_files) == 1:
+        # 只有一个文件时不值得启动进程池
+        results = [merge_one(split_info_files[0])]
+    else:
+        # 各文件的合并和哈希校验互不相关，分到多个进程并行
+        workers = min(len(split_info_files), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(merge_one, split_info_files))
+    success_count = sum(1 for ok in results if ok)
     
     if success_count == len(split_info_files):
         log_info("✓ 所有拆分文件合并成功")
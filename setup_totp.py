@@ -3,7 +3,17 @@ import qrcode
 import os
 from logger import logger
 
-def generate_totp_config():
+def save_qr_png(qr, path):
+    """把二维码渲染成 PNG 并保存"""
+    img = qr.make_image(fill_color="black", back_color="white")
+    img.save(path)
+    logger.info(f"\n二维码也已保存为 '{path}'")
+
+def generate_totp_config(executor=None):
+    """生成 TOTP 密钥并输出二维码
+
+    传入 executor 时 PNG 在后台线程里生成，返回对应的 Future，调用方需要在退出前等待它。
+    """
     # 生成一个新的 TOTP 密钥
     secret = pyotp.random_base32()
     logger.info(f"你的TOTP密钥: {secret}, 不要告诉其他人哦!")
@@ -23,9 +33,10 @@ def generate_totp_config():
     qr.print_ascii(invert=True)
     
     # Also save as image just in case
-    img = qr.make_image(fill_color="black", back_color="white")
-    img.save("totp_qr.png")
-    logger.info("\n二维码也已保存为 'totp_qr.png'")
+    if executor is not None:
+        return executor.submit(save_qr_png, qr, "totp_qr.png")
+    save_qr_png(qr, "totp_qr.png")
+    return None
 
 if __name__ == "__main__":
     generate_totp_config()
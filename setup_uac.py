@@ -1,9 +1,9 @@
 import json
-import hashlib
 import os
 import getpass
 import secrets
 from logger import logger
+from TomatOS_UAC import hash_password
 
 def setup_secrets():
     logger.info("=== TomatOS UAC Setup ===")
@@ -25,11 +25,11 @@ def setup_secrets():
         print("TOTP 密钥不能为空!")
         return
 
-    # 4. 生成盐值
-    salt = secrets.token_hex(2048)  # 4096 字节的十六进制字符串
+    # 4. 生成盐值 (用于访客颜色/user_id，密码哈希自带盐)
+    salt = secrets.token_hex(16)
     
-    # 5. 哈希密码 (SHA256(password + salt))
-    passhash = hashlib.sha256((password + salt).encode()).hexdigest()
+    # 5. 哈希密码 (scrypt)
+    passhash = hash_password(password)
     
     # 6. 保存到 JSON
     secrets_data = {
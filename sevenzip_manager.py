@@ -11,54 +11,156 @@ import platform
 import tempfile
 import shutil
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Optional, List, Tuple, Callable
 import urllib.request
 import zipfile
 import stat
+import functools
+import threading
+import collections
+from concurrent.futures import ProcessPoolExecutor
+
+# psutil 用于根据可用内存选择字典大小，没有时使用 7z 默认值
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# py7zr 可以在进程内压缩多个小文件，没有时退回到一次 7z 调用
+try:
+    import py7zr
+except ImportError:
+    py7zr = None
+
+def run_7z(cmd: List[str], timeout: int = 3600,
+           on_line: Optional[Callable[[str], None]] = None) -> Tuple[int, str]:
+    """
+    运行 7z 命令
+    
+    标准输出和错误输出合并后逐行读取，只保留最后 256 行用于报错，
+    内存占用与输出量无关；传入 on_line 时每一行都会实时交给它处理
+    
+    Returns:
+        (返回码, 失败时的最后几行输出)
+        
+    Raises:
+        subprocess.TimeoutExpired: 超时 (进程已被结束)
+    """
+    tail = collections.deque(maxlen=256)
+    timed_out = threading.Event()
+    proc = subprocess.Popen(
+        cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1 << 16
+    )
+    
+    def kill_on_timeout():
+        timed_out.set()
+        proc.kill()
+    
+    timer = threading.Timer(timeout, kill_on_timeout)
+    timer.daemon = True
+    timer.start()
+    try:
+        with proc.stdout:
+            for raw_line in proc.stdout:
+                tail.append(raw_line)
+                if on_line is not None:
+                    on_line(raw_line.decode("utf-8", "replace").rstrip())
+        returncode = proc.wait()
+    finally:
+        timer.cancel()
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if returncode == 0:
+        return 0, ""
+    return returncode, b"".join(tail).decode("utf-8", "replace")
+
+def auto_dict_size_mb(threads: int) -> Optional[int]:
+    """
+    根据可用内存选择 LZMA2 字典大小（MB）
+    
+    LZMA2 每两个线程一个编码器，每个编码器约占字典大小的 11 倍内存，
+    这里让 7z 总共最多使用约 1/4 的可用内存，再平分给各编码器，
+    限制在 4MB ~ 128MB 并取 2 的幂；没有 psutil 时返回 None，使用 7z 默认值
+    """
+    if psutil is None:
+        return None
+    available_mb = psutil.virtual_memory().available // (1024 * 1024)
+    encoders = max(1, (threads + 1) // 2)
+    dict_mb = min(max(4, available_mb // 4 // 11 // encoders), 128)
+    return 1 << (dict_mb.bit_length() - 1)
+
+def stderr_tail(stderr: Optional[bytes], limit: int = 4096) -> str:
+    """只解码错误输出的最后一段用于报错"""
+    if not stderr:
+        return ""
+    return stderr[-limit:].decode("utf-8", "replace").strip()
+
+def print_7z_line(line: str):
+    """实时输出 7z 的一行输出"""
+    if line:
+        print(f"  [7z] {line}")
+
+@functools.lru_cache(maxsize=None)
+def find_sevenzip(system: str) -> Optional[Path]:
+    """
+    查找系统中已安装的 7-Zip，结果在进程内缓存
+    
+    安装 7-Zip 后需要调用 find_sevenzip.cache_clear() 重新查找
+    """
+    
+    # Windows
+    if system == "windows":
+        found = shutil.which("7z.exe") or shutil.which("7z")
+        if found:
+            return Path(found)
+        
+        # 常见安装路径 (安装程序默认不加入 PATH)
+        possible_paths = [
+            Path(os.environ.get("ProgramFiles", "C:\\Program Files")) / "7-Zip" / "7z.exe",
+            Path(os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")) / "7-Zip" / "7z.exe",
+        ]
+        for path in possible_paths:
+            if path.exists():
+                return path
+    
+    # Linux/macOS
+    elif system in ["linux", "darwin"]:
+        # 检查是否在 PATH 中
+        found = shutil.which("7z")
+        if found:
+            return Path(found)
+    
+    return None
 
 class SevenZipManager:
     """7-Zip 管理器类"""
     
+    # 固定的命令参数
+    compress_level_flags = ("-mx5",)  # 压缩级别 (使用 mx5 以平衡速度和内存)
+    extract_flags = ("-y",)  # 解压时覆盖所有文件
+    
     def __init__(self):
         self.system = platform.system().lower()
         self.sevenzip_path = self._find_sevenzip()
+        self._installed = None  # is_installed 的缓存结果，重新查找路径后清空
         
     def _find_sevenzip(self) -> Optional[Path]:
         """查找系统中已安装的 7-Zip"""
-        
-        # Windows 上的常见安装路径
-        if self.system == "windows":
-            possible_paths = [
-                Path("C:\\Program Files\\7-Zip\\7z.exe"),
-                Path("C:\\Program Files (x86)\\7-Zip\\7z.exe"),
-                Path(os.environ.get("ProgramFiles", "C:\\Program Files")) / "7-Zip" / "7z.exe",
-                Path(os.environ.get("ProgramFiles(x86)", "C:\\Program Files (x86)")) / "7-Zip" / "7z.exe",
-            ]
-            
-            # 检查 PATH 环境变量
-            for path_dir in os.environ.get("PATH", "").split(os.pathsep):
-                possible_paths.append(Path(path_dir) / "7z.exe")
-            
-            for path in possible_paths:
-                if path.exists():
-                    return path
-        
-        # Linux/macOS
-        elif self.system in ["linux", "darwin"]:
-            # 检查是否在 PATH 中
-            try:
-                result = subprocess.run(["which", "7z"], 
-                                      capture_output=True, text=True)
-                if result.returncode == 0:
-                    return Path(result.stdout.strip())
-            except (subprocess.SubprocessError, FileNotFoundError):
-                pass
-        
-        return None
+        return find_sevenzip(self.system)
     
     def is_installed(self) -> bool:
         """检查 7-Zip 是否已安装"""
-        return self.sevenzip_path is not None and self.sevenzip_path.exists()
+        if self._installed is None:
+            self._installed = self.sevenzip_path is not None and self.sevenzip_path.exists()
+        return self._installed
     
     def install_sevenzip(self) -> bool:
         """安装 7-Zip"""
@@ -89,7 +191,10 @@ class SevenZipManager:
             temp_dir = tempfile.gettempdir()
             installer_path = Path(temp_dir) / installer_name
             
-            urllib.request.urlretrieve(sevenzip_url, installer_path)
+            # 以 1MB 为单位流式写入 (urlretrieve 每次只读 8KB)
+            with urllib.request.urlopen(sevenzip_url, timeout=60) as response, \
+                    open(installer_path, "wb") as installer_file:
+                shutil.copyfileobj(response, installer_file, 1024 * 1024)
             
             print(f"安装程序已下载到: {installer_path}")
             print("正在安装 7-Zip (静默安装)...")
@@ -97,8 +202,8 @@ class SevenZipManager:
             # 静默安装
             result = subprocess.run(
                 [str(installer_path), "/S", f"/D=C:\\Program Files\\7-Zip"],
-                capture_output=True,
-                text=True,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
                 timeout=300  # 5分钟超时
             )
             
@@ -108,10 +213,12 @@ class SevenZipManager:
             if result.returncode == 0:
                 print("✓ 7-Zip 安装成功")
                 # 重新查找路径
+                find_sevenzip.cache_clear()
                 self.sevenzip_path = self._find_sevenzip()
+                self._installed = None
                 return True
             else:
-                print(f"✗ 7-Zip 安装失败: {result.stderr}")
+                print(f"✗ 7-Zip 安装失败: {stderr_tail(result.stderr)}")
                 return False
                 
         except Exception as e:
@@ -127,30 +234,32 @@ class SevenZipManager:
             # 检测包管理器
             if shutil.which("apt-get"):
                 # Debian/Ubuntu
-                subprocess.run(["sudo", "apt-get", "update"], check=True)
-                subprocess.run(["sudo", "apt-get", "install", "-y", "p7zip-full"], check=True)
+                subprocess.run(["sudo", "apt-get", "update"], stderr=subprocess.PIPE, check=True)
+                subprocess.run(["sudo", "apt-get", "install", "-y", "p7zip-full"], stderr=subprocess.PIPE, check=True)
             elif shutil.which("yum"):
                 # RHEL/CentOS
-                subprocess.run(["sudo", "yum", "install", "-y", "p7zip"], check=True)
+                subprocess.run(["sudo", "yum", "install", "-y", "p7zip"], stderr=subprocess.PIPE, check=True)
             elif shutil.which("dnf"):
                 # Fedora
-                subprocess.run(["sudo", "dnf", "install", "-y", "p7zip"], check=True)
+                subprocess.run(["sudo", "dnf", "install", "-y", "p7zip"], stderr=subprocess.PIPE, check=True)
             elif shutil.which("pacman"):
                 # Arch Linux
-                subprocess.run(["sudo", "pacman", "-S", "--noconfirm", "p7zip"], check=True)
+                subprocess.run(["sudo", "pacman", "-S", "--noconfirm", "p7zip"], stderr=subprocess.PIPE, check=True)
             elif shutil.which("zypper"):
                 # openSUSE
-                subprocess.run(["sudo", "zypper", "install", "-y", "p7zip"], check=True)
+                subprocess.run(["sudo", "zypper", "install", "-y", "p7zip"], stderr=subprocess.PIPE, check=True)
             else:
                 print("✗ 不支持的系统包管理器")
                 return False
             
             print("✓ p7zip 安装成功")
+            find_sevenzip.cache_clear()
             self.sevenzip_path = self._find_sevenzip()
+            self._installed = None
             return True
             
         except subprocess.CalledProcessError as e:
-            print(f"✗ 安装失败: {e}")
+            print(f"✗ 安装失败: {e}\n{stderr_tail(e.stderr)}")
             return False
         except Exception as e:
             print(f"✗ 安装时出错: {e}")
@@ -164,23 +273,45 @@ class SevenZipManager:
         try:
             # 使用 Homebrew
             if shutil.which("brew"):
-                subprocess.run(["brew", "install", "p7zip"], check=True)
+                subprocess.run(["brew", "install", "p7zip"], stderr=subprocess.PIPE, check=True)
                 print("✓ 7-Zip 安装成功")
+                find_sevenzip.cache_clear()
                 self.sevenzip_path = self._find_sevenzip()
+                self._installed = None
                 return True
             else:
                 print("✗ 未找到 Homebrew，请先安装 Homebrew")
                 return False
                 
         except subprocess.CalledProcessError as e:
-            print(f"✗ 安装失败: {e}")
+            print(f"✗ 安装失败: {e}\n{stderr_tail(e.stderr)}")
             return False
         except Exception as e:
             print(f"✗ 安装时出错: {e}")
             return False
     
+    def _compression_flags(self, threads: int = None, method: str = "lzma2",
+                           dict_mb: int = None) -> List[str]:
+        """构建压缩算法、字典大小和线程数参数，所有压缩入口共用"""
+        
+        # -mmt=on 时 7z 自己选的线程数往往偏少，这里显式指定为 CPU 核心数
+        if threads is None:
+            threads = os.cpu_count() or 1
+        
+        # 字典大小只对 LZMA/LZMA2 有意义
+        dict_flags = ()
+        if method.lower() in ("lzma", "lzma2"):
+            if dict_mb is None:
+                dict_mb = auto_dict_size_mb(threads)
+            if dict_mb:
+                dict_flags = (f"-md={dict_mb}m", "-mfb=64", "-ms=on")
+        
+        return [f"-m0={method}", *self.compress_level_flags, *dict_flags, f"-mmt{max(1, threads)}"]
+    
     def compress_with_7z(self, source_path: Path, output_path: Path, 
-                        split_size_mb: int = 50, password: str = None) -> bool:
+                        split_size_mb: int = 50, password: str = None,
+                        threads: int = None, method: str = "lzma2",
+                        show_output: bool = False, dict_mb: int = None) -> bool:
         """
         使用 7-Zip 压缩文件/目录
         
@@ -189,6 +320,10 @@ class SevenZipManager:
             output_path: 输出文件路径（不含扩展名）
             split_size_mb: 分卷大小（MB）
             password: 密码（可选）
+            threads: 压缩线程数（默认使用全部 CPU 核心）
+            method: 压缩算法（lzma2/ppmd 等，对应 7z 的 -m0 参数）
+            show_output: 是否实时输出 7z 的输出
+            dict_mb: LZMA/LZMA2 字典大小（MB，默认按可用内存自动选择）
             
         Returns:
             是否成功
@@ -205,52 +340,49 @@ class SevenZipManager:
         print(f"使用 7-Zip 压缩: {source_path}")
         print(f"输出到: {output_path}.7z")
         
-        # 构建 7z 命令
-        cmd = [str(self.sevenzip_path), "a"]
-        
-        # 分卷参数
-        if split_size_mb > 0:
-            cmd.append(f"-v{split_size_mb}m")
-        
-        # 密码参数
-        if password:
-            cmd.extend(["-p" + password])
-        
-        # 压缩级别 (使用 mx5 以平衡速度和内存)
-        cmd.extend(["-mx5", "-mmt=on"])
-        
-        # 输出文件和源文件
+        # 输出文件
         # 如果 output_path 已经以 .7z 结尾，就不再添加
         output_str = str(output_path)
         if not output_str.lower().endswith(".7z"):
             output_str += ".7z"
-            
-        cmd.append(output_str)
-        cmd.append(str(source_path))
+        
+        # 构建 7z 命令: 分卷参数、密码参数只在需要时加入
+        cmd = [
+            str(self.sevenzip_path), "a",
+            *((f"-v{split_size_mb}m",) if split_size_mb > 0 else ()),
+            *(("-p" + password,) if password else ()),
+            *self._compression_flags(threads, method, dict_mb),
+            output_str, str(source_path)
+        ]
         
         try:
             print(f"执行命令: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=3600  # 1小时超时
-            )
+            returncode, stderr = run_7z(cmd, timeout=3600,  # 1小时超时
+                                        on_line=print_7z_line if show_output else None)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("✓ 压缩成功")
                 
                 # 检查是否生成了分卷文件
                 if split_size_mb > 0:
-                    vol_files = list(output_path.parent.glob(f"{output_path.name}.7z.*"))
-                    print(f"生成 {len(vol_files)} 个分卷文件")
-                    for vol_file in vol_files:
-                        size_mb = vol_file.stat().st_size / (1024 * 1024)
-                        print(f"  {vol_file.name} - {size_mb:.2f} MB")
+                    # scandir 一次列出目录，分卷信息攒在一起一次性输出
+                    # 按实际的压缩包名匹配 (output_path 可能已带 .7z 后缀)
+                    # 只认 .001 这样的纯数字分卷后缀，按分卷号排序
+                    prefix = f"{Path(output_str).name}."
+                    volumes = []
+                    with os.scandir(Path(output_str).parent) as entries:
+                        for entry in entries:
+                            name = entry.name
+                            if name.startswith(prefix) and name[len(prefix):].isdigit() and entry.is_file():
+                                volumes.append((int(name[len(prefix):]), name, entry.stat().st_size))
+                    volumes.sort()
+                    lines = [f"  {name} - {size / (1024 * 1024):.2f} MB\n" for _, name, size in volumes]
+                    sys.stdout.write(f"生成 {len(volumes)} 个分卷文件\n" + "".join(lines))
+                    sys.stdout.flush()
                 
                 return True
             else:
-                print(f"✗ 压缩失败: {result.stderr}")
+                print(f"✗ 压缩失败: {stderr}")
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -260,8 +392,85 @@ class SevenZipManager:
             print(f"✗ 压缩时出错: {e}")
             return False
     
+    def compress_many(self, paths: List[Path], output_path: Path,
+                      threads: int = None, method: str = "lzma2", dict_mb: int = None) -> bool:
+        """
+        把多个文件/目录压缩进同一个 7z 文件（不分卷）
+        
+        有 py7zr 时在进程内完成，否则只调用一次 7z，
+        避免为每个小文件单独启动一个 7z 进程
+        
+        Args:
+            paths: 源文件/目录列表
+            output_path: 输出文件路径
+            threads: 压缩线程数（默认使用全部 CPU 核心）
+            method: 压缩算法（lzma2/ppmd 等，对应 7z 的 -m0 参数）
+            dict_mb: LZMA/LZMA2 字典大小（MB，默认按可用内存自动选择）
+            
+        Returns:
+            是否成功
+        """
+        
+        missing = [path for path in paths if not path.exists()]
+        if missing:
+            print(f"错误: 源路径不存在: {', '.join(map(str, missing))}")
+            return False
+        
+        # 压缩包内只保留文件名，同名的输入会互相覆盖
+        names = collections.Counter(path.name for path in paths)
+        duplicates = sorted(name for name, count in names.items() if count > 1)
+        if duplicates:
+            print(f"错误: 存在同名的源路径: {', '.join(duplicates)}")
+            return False
+        
+        output_str = str(output_path)
+        if not output_str.lower().endswith(".7z"):
+            output_str += ".7z"
+        
+        # py7zr 只用于 LZMA2，参数与 7z 命令行保持一致 (mx5 + 相同的字典大小)
+        if py7zr is not None and method.lower() == "lzma2":
+            try:
+                lzma2_filter = {"id": py7zr.FILTER_LZMA2, "preset": 5}
+                if dict_mb is None:
+                    dict_mb = auto_dict_size_mb(threads or os.cpu_count() or 1)
+                if dict_mb:
+                    lzma2_filter["dict_size"] = dict_mb * 1024 * 1024
+                filters = [lzma2_filter]
+                with py7zr.SevenZipFile(output_str, "w", filters=filters) as archive:
+                    for path in paths:
+                        archive.writeall(path, arcname=path.name)
+                print(f"✓ 已压缩 {len(paths)} 个文件到: {output_str}")
+                return True
+            except Exception as e:
+                print(f"✗ 压缩时出错: {e}")
+                return False
+        
+        if not self.is_installed():
+            print("错误: 7-Zip 未安装")
+            return False
+        
+        cmd = [
+            str(self.sevenzip_path), "a",
+            *self._compression_flags(threads, method, dict_mb),
+            output_str, *map(str, paths)
+        ]
+        
+        try:
+            returncode, stderr = run_7z(cmd, timeout=3600)
+            if returncode == 0:
+                print(f"✓ 已压缩 {len(paths)} 个文件到: {output_str}")
+                return True
+            print(f"✗ 压缩失败: {stderr}")
+            return False
+        except subprocess.TimeoutExpired:
+            print("✗ 压缩超时")
+            return False
+        except Exception as e:
+            print(f"✗ 压缩时出错: {e}")
+            return False
+    
     def extract_with_7z(self, archive_path: Path, output_dir: Path, 
-                       password: str = None) -> bool:
+                       password: str = None, show_output: bool = False) -> bool:
         """
         使用 7-Zip 解压文件
         
@@ -269,6 +478,7 @@ class SevenZipManager:
             archive_path: 压缩文件路径（可以是分卷的第一个文件）
             output_dir: 输出目录
             password: 密码（可选）
+            show_output: 是否实时输出 7z 的输出
             
         Returns:
             是否成功
@@ -288,33 +498,24 @@ class SevenZipManager:
         print(f"使用 7-Zip 解压: {archive_path}")
         print(f"解压到: {output_dir}")
         
-        # 构建 7z 命令
-        cmd = [str(self.sevenzip_path), "x"]
-        
-        # 密码参数
-        if password:
-            cmd.extend(["-p" + password])
-        
-        # 输出目录和源文件
-        cmd.extend([f"-o{output_dir}", str(archive_path)])
-        
-        # 覆盖所有文件
-        cmd.append("-y")
+        # 构建 7z 命令: 密码参数 (可选)、输出目录和源文件、覆盖所有文件
+        cmd = [
+            str(self.sevenzip_path), "x",
+            *(("-p" + password,) if password else ()),
+            f"-o{output_dir}", str(archive_path),
+            *self.extract_flags
+        ]
         
         try:
             print(f"执行命令: {' '.join(cmd)}")
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=3600  # 1小时超时
-            )
+            returncode, stderr = run_7z(cmd, timeout=3600,  # 1小时超时
+                                        on_line=print_7z_line if show_output else None)
             
-            if result.returncode == 0:
+            if returncode == 0:
                 print("✓ 解压成功")
                 return True
             else:
-                print(f"✗ 解压失败: {result.stderr}")
+                print(f"✗ 解压失败: {stderr}")
                 return False
                 
         except subprocess.TimeoutExpired:
@@ -324,13 +525,15 @@ class SevenZipManager:
             print(f"✗ 解压时出错: {e}")
             return False
     
-    def create_split_archive(self, source_path: Path, chunk_size_mb: int = 50) -> Tuple[bool, Path]:
+    def create_split_archive(self, source_path: Path, chunk_size_mb: int = 50,
+                             threads: int = None) -> Tuple[bool, Path]:
         """
         创建分卷压缩文件（用于 Git 上传）
         
         Args:
             source_path: 源文件/目录
             chunk_size_mb: 分卷大小（MB）
+            threads: 压缩线程数（默认使用全部 CPU 核心）
             
         Returns:
             (是否成功, 第一个分卷文件路径)
@@ -346,7 +549,8 @@ class SevenZipManager:
         success = self.compress_with_7z(
             source_path=source_path,
             output_path=output_base,
-            split_size_mb=chunk_size_mb
+            split_size_mb=chunk_size_mb,
+            threads=threads
         )
         
         if success:
@@ -359,6 +563,29 @@ class SevenZipManager:
         else:
             return False, None
     
+    def create_split_archives(self, sources: List[Path], chunk_size_mb: int = 50) -> List[Tuple[bool, Path]]:
+        """
+        并行为多个源文件/目录创建分卷压缩文件
+        
+        Args:
+            sources: 源文件/目录列表
+            chunk_size_mb: 分卷大小（MB）
+            
+        Returns:
+            与 sources 顺序一致的 (是否成功, 第一个分卷文件路径) 列表
+        """
+        
+        if len(sources) <= 1:
+            return [self.create_split_archive(source, chunk_size_mb) for source in sources]
+        
+        cpu_count = os.cpu_count() or 1
+        workers = min(len(sources), cpu_count)
+        # CPU 核心分给各个进程，避免 N 个 7z 各开满线程互相争抢
+        threads = max(1, cpu_count // workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_create_split_archive_worker,
+                                 [(source, chunk_size_mb, threads) for source in sources]))
+    
     def extract_split_archive(self, first_volume_path: Path, output_dir: Path) -> bool:
         """
         解压分卷压缩文件
@@ -372,6 +599,11 @@ class SevenZipManager:
         """
         return self.extract_with_7z(first_volume_path, output_dir)
 
+def _create_split_archive_worker(args: Tuple[Path, int, int]) -> Tuple[bool, Path]:
+    """进程池任务: 在子进程中创建一个分卷压缩文件"""
+    source_path, chunk_size_mb, threads = args
+    return SevenZipManager().create_split_archive(source_path, chunk_size_mb, threads=threads)
+
 def ensure_sevenzip_installed() -> SevenZipManager:
     """
     确保 7-Zip 已安装，如果没有则自动安装
@@ -409,6 +641,7 @@ def main():
     parser.add_argument("--split-size", type=int, default=50,
                        help="分卷大小（MB，默认50）")
     parser.add_argument("--password", type=str, help="密码（可选）")
+    parser.add_argument("--verbose", action="store_true", help="实时显示 7z 输出")
     
     args = parser.parse_args()
     
@@ -438,7 +671,8 @@ def main():
             source_path=source_path,
             output_path=output_path,
             split_size_mb=args.split_size,
-            password=args.password
+            password=args.password,
+            show_output=args.verbose
         )
         
         if success:
@@ -457,7 +691,8 @@ def main():
         success = manager.extract_with_7z(
             archive_path=archive_path,
             output_dir=output_dir,
-            password=args.password
+            password=args.password,
+            show_output=args.verbose
         )
         
         if success:
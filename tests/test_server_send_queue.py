@@ -0,0 +1,65 @@
+import asyncio
+import os
+import sys
+import unittest
+
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import server  # noqa: E402
+
+
+class SendQueueLimitTest(unittest.IsolatedAsyncioTestCase):
+    """发送队列溢出后连接应被注销并关闭，WebSocket 处理函数正常退出"""
+
+    async def asyncSetUp(self):
+        # 不初始化 bot / UAC，只保留 handle_websocket 用到的状态
+        self.tomatos = server.TomatOSServer.__new__(server.TomatOSServer)
+        self.tomatos.clients = {}
+        self.tomatos.closing_tasks = {}
+        self.handler_errors = []
+
+        async def handle_websocket(request):
+            try:
+                return await self.tomatos.handle_websocket(request)
+            except BaseException as e:
+                self.handler_errors.append(e)
+                raise
+
+        app = web.Application()
+        app.router.add_get('/ws', handle_websocket)
+        self.client = TestClient(TestServer(app))
+        await self.client.start_server()
+
+    async def asyncTearDown(self):
+        await self.client.close()
+
+    async def test_overflow_closes_connection(self):
+        async with self.client.ws_connect('/ws') as ws:
+            # 等服务端注册连接
+            while not self.tomatos.clients:
+                await asyncio.sleep(0.01)
+            server_ws, client_state = next(iter(self.tomatos.clients.items()))
+
+            # 写任务没有被唤醒，直接把队列塞满；处理下一条 init 时回复的消息会让队列溢出
+            client_state.send_queue.extend([b'{}'] * server.send_queue_limit)
+
+            # 连续发两条，第二条在连接被注销时已经在服务端的接收缓冲里
+            init = '{"type": "init", "userAgent": "", "language": "zh-CN"}'
+            await ws.send_str(init)
+            await ws.send_str(init)
+            msg = await ws.receive(timeout=5)
+            while msg.type is not aiohttp.WSMsgType.CLOSE:
+                msg = await ws.receive(timeout=5)
+            self.assertEqual(msg.data, aiohttp.WSCloseCode.TRY_AGAIN_LATER)
+            self.assertNotIn(server_ws, self.tomatos.clients)
+
+        self.assertEqual(self.handler_errors, [])
+        self.assertTrue(client_state.writer_task.cancelled() or client_state.writer_task.done())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,13 +2,15 @@ import asyncio
 import os
 import json
 import signal
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, time
 from logger import logger
 import sys
 
 AppShutdownTimeDelta = 3 * 60  # seconds # 关机缓冲时间, 避免过快关机导致任务丢失(到时候学校就会断电)
 WeekdayPoweroffTimetable = "56 22 * * * 0-4"  # 每天22点56分关机 (周日到周四)
 WeekendPoweroffTimetable = "26 23 * * * 5-6"  # 每天23点26分关机 周五周六
+WeekdayPoweroffTime = time(22, 56, 0)  # 工作日关机时间
+WeekendPoweroffTime = time(23, 26, 0)  # 周末关机时间
 
 self_path = os.path.abspath(__file__)
 base_dir = os.path.dirname(self_path)
@@ -21,6 +23,23 @@ progress_base = {
     "filepath" : "",       # 进程文件路径
     "status" : "stopped"   # 进程状态(running/stopped)
 }
+# 有 orjson 就用 orjson 解析
+try:
+    import orjson
+
+    def json_loads(data):
+        return orjson.loads(data)
+except ImportError:
+    json_loads = json.loads
+
+def load_progress():
+    """读取进程表, 文件不存在返回 None"""
+    p_path = os.path.expanduser(progress_json_path)
+    try:
+        with open(p_path, 'rb') as f:
+            return json_loads(f.read())
+    except FileNotFoundError:
+        return None
 
 # 任务表
 task_json_path = os.path.join(base_dir, "task.json")
@@ -30,14 +49,55 @@ task_base = {
     "logfile": os.path.join(base_dir, "task.log")
 }
 
+async def wait_process_exit(pid, timeout):
+    """等待进程退出，返回是否在 timeout 秒内退出
+
+    Linux 上用 pidfd 等待，进程退出时立刻被唤醒；不支持时每秒检查一次
+    """
+    loop = asyncio.get_running_loop()
+    pidfd = None
+    if hasattr(os, "pidfd_open"):
+        try:
+            pidfd = os.pidfd_open(pid)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            # 内核不支持 pidfd_open，退回轮询
+            pidfd = None
+
+    if pidfd is not None:
+        exited = loop.create_future()
+        # pidfd 在进程退出时变为可读
+        loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await asyncio.wait_for(exited, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        try:
+            os.kill(pid, 0) # 检查进程还在不在
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            # 进程还在，只是属于其他用户
+            pass
+        await asyncio.sleep(1)
+    return False
+
 async def safe_poweroff(force = False, restart=False):
     """安全关机函数，等待缓冲时间后执行关机(缓冲期内关闭完进程也会关机), 在此期间会安全关闭所有计划任务"""
     now = datetime.now()
     now_weekday = now.weekday()  # 星期几 0-6 对应 周一到周日
     if now_weekday <= 4:
-        poweroff_time_delta = datetime.strptime("22:56:00", "%H:%M:%S").time()
+        poweroff_time_delta = WeekdayPoweroffTime
     else:
-        poweroff_time_delta = datetime.strptime("23:26:00", "%H:%M:%S").time()
+        poweroff_time_delta = WeekendPoweroffTime
 
     poweroff_time = datetime.combine(now.date(), poweroff_time_delta)
     force_time = poweroff_time + timedelta(seconds=AppShutdownTimeDelta)
@@ -53,11 +113,10 @@ async def safe_poweroff(force = False, restart=False):
     # 尝试关闭程序
     pid = 0
     try:
-        p_path = os.path.expanduser(progress_json_path)
-        if os.path.exists(p_path):
-            with open(p_path, 'r') as f:
-                prog = json.load(f)
-                pid = prog.get('pid', 0)
+        # 文件读取放到线程里，不阻塞事件循环
+        prog = await asyncio.to_thread(load_progress)
+        if prog:
+            pid = prog.get('pid', 0)
     except Exception as e:
         logger.error(f"读取进程表失败: {e}")
 
@@ -69,24 +128,26 @@ async def safe_poweroff(force = False, restart=False):
             os.kill(pid, signal.SIGTERM)
             
             # 等待进程结束或直到强制关机时间
-            while datetime.now() < force_time:
-                try:
-                    os.kill(pid, 0) # 检查进程还在不在
-                    await asyncio.sleep(1)
-                except OSError:
-                    logger.info("进程已优雅退出。")
-                    break
+            timeout = (force_time - datetime.now()).total_seconds()
+            if await wait_process_exit(pid, timeout):
+                logger.info("进程已优雅退出。")
             else:
                 logger.warning("缓冲时间已超出，强制关机。")
-        except OSError:
+        except ProcessLookupError:
             logger.info("进程未运行。")
+        except PermissionError:
+            logger.error(f"没有权限向进程 {pid} 发送信号，无法安全关闭。")
     
     # 执行关机
     logger.info("系统正在关机。")
-    if restart:
-        os.system("reboot")
-    else:
-        os.system("shutdown now")
+    # 直接用 shutdown/reboot 替换当前进程，不再经过 /bin/sh；替换前先刷新输出，避免丢失最后的日志
+    argv = ["reboot"] if restart else ["shutdown", "now"]
+    sys.stdout.flush()
+    sys.stderr.flush()
+    try:
+        os.execvp(argv[0], argv)
+    except OSError as e:
+        logger.error(f"执行 {' '.join(argv)} 失败: {e}")
 
 def main():
     # 获取运行参数